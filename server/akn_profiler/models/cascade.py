@@ -28,32 +28,67 @@ Public API
 
 from __future__ import annotations
 
+import copy
+import dataclasses
+import functools
+import heapq
 import logging
+import re
 from collections import defaultdict
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import yaml
 
+try:  # Prefer the libyaml C backend — an order of magnitude faster
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover — PyYAML built without libyaml
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 if TYPE_CHECKING:
-    from akn_profiler.xsd.schema_loader import AknSchema
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from akn_profiler.xsd.schema_loader import AknSchema, ElementInfo
 
 logger = logging.getLogger(__name__)
 
+# Sentinel distinguishing "key absent" from a ``None`` value
+_MISSING = object()
+
+# Blank-line insertion (see ``_insert_blank_lines``).  Each break is a
+# zero-width match at the start of a line whose predecessor is not blank.
+_SECTION_BREAK_RE = re.compile(r"(?<=[^\n]\n)(?=  (?:documentTypes|elements):)")
+# ``  elements:`` header + the block below it (lines indented >= 2, or blank)
+_ELEMENTS_BLOCK_RE = re.compile(r"(?m)^(  elements:\n)((?:\n|  [^\n]*\n?)*)")
+# A 4-space-indented key inside the block, not directly after a header
+_ELEMENT_BREAK_RE = re.compile(
+    r"(?m)(?<=[^\n]\n)(?<!^  elements:\n)(?=    (?=[^ \n])(?:[^\n]*:$|[^\n]*: ))"
+)
+
 
 # ------------------------------------------------------------------
 # Custom YAML dumper — ``None`` → blank (``key:``) not ``key: null``
 # ------------------------------------------------------------------
 
 
-class _ProfileDumper(yaml.SafeDumper):
-    """YAML dumper that writes ``None`` as blank instead of ``null``."""
+class _ProfileDumper(_SafeDumper):
+    """YAML dumper that writes ``None`` as blank instead of ``null``.
+
+    Tuples (the schema's shared enum value sequences) are written as
+    plain lists and never as ``&anchor`` / ``*alias`` pairs.
+    """
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return type(data) is tuple or super().ignore_aliases(data)
 
 
-def _none_representer(dumper: yaml.Dumper, _data: object) -> yaml.Node:
+def _none_representer(dumper: yaml.BaseDumper, _data: object) -> yaml.Node:
     return dumper.represent_scalar("tag:yaml.org,2002:null", "")
 
 
 _ProfileDumper.add_representer(type(None), _none_representer)
+_ProfileDumper.add_representer(tuple, _SafeDumper.represent_list)
 
 
 # ------------------------------------------------------------------
@@ -75,6 +110,8 @@ def expand_element(
 
     Returns the modified YAML text.  If the element already exists it
     is left untouched but its required children are still ensured.
+    When nothing needs to change, *yaml_text* is returned as-is without
+    re-serialising the profile.
 
     When *auto_add_eid*, *auto_add_wid*, or *auto_add_guid* are set,
     the corresponding identity attributes are automatically included on
@@ -82,7 +119,30 @@ def expand_element(
     the auto-added identity attributes are marked ``required: true``
     or ``required: false``.
     """
-    raw = yaml.safe_load(yaml_text)
+    return _expand_cached(
+        yaml_text,
+        element_name,
+        schema,
+        tuple(_build_auto_id_list(auto_add_eid, auto_add_wid, auto_add_guid)),
+        auto_id_required,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _expand_cached(
+    yaml_text: str,
+    element_name: str,
+    schema: AknSchema,
+    auto_id_attrs: tuple[str, ...],
+    auto_id_required: bool,
+) -> str:
+    """Memoised body of :func:`expand_element`.
+
+    The result depends only on the (immutable) arguments, so repeated
+    clicks on the same code action or a preview followed by the apply
+    skip the parse/dump round-trip entirely.
+    """
+    raw = _load(yaml_text)
     if not isinstance(raw, dict) or "profile" not in raw:
         return yaml_text
 
@@ -91,12 +151,13 @@ def expand_element(
         return yaml_text
 
     elements = profile.get("elements")
+    mutated = False
     if not isinstance(elements, dict):
         elements = {}
         profile["elements"] = elements
+        mutated = True
 
-    auto_id_attrs = _build_auto_id_list(auto_add_eid, auto_add_wid, auto_add_guid)
-    _recursive_add(
+    mutated |= _recursive_add(
         schema,
         element_name,
         elements,
@@ -105,13 +166,15 @@ def expand_element(
         auto_id_required=auto_id_required,
     )
 
-    # Ensure akomaNtoso is present as root with document-type children,
-    # and appears first in the elements dict.
-    _ensure_akomantoso_root(profile, elements, schema)
+    # Ensure akomaNtoso is present as root with document-type children
+    mutated |= _ensure_akomantoso_root(profile, elements, schema)
 
-    # Reorder elements into canonical order (parents before children)
-    _apply_element_order(elements, schema)
+    # Reorder elements into canonical order (akomaNtoso first, then
+    # parents before children)
+    mutated |= _apply_element_order(elements, schema)
 
+    if not mutated:
+        return yaml_text
     return _dump(raw)
 
 
@@ -133,37 +196,72 @@ def _recursive_add(
     elements: dict,
     visited: set[str],
     *,
-    auto_id_attrs: list[str] | None = None,
+    auto_id_attrs: Sequence[str] | None = None,
     auto_id_required: bool = True,
-) -> None:
-    """Recursively ensure *elem_name* and its required chain exist."""
-    if elem_name in visited:
-        return
-    visited.add(elem_name)
+) -> bool:
+    """Ensure *elem_name* and its required chain exist.
 
-    info = schema.get_element_info(elem_name)
-    if info is None:
-        return
+    Walks the required-child chain depth-first with an explicit stack,
+    so deep AKN hierarchies cannot hit the recursion limit.  Returns
+    ``True`` if any profile entry was added or changed.
+    """
+    get_info = schema.get_element_info
+    mutated = False
+    stack = [elem_name]
+    while stack:
+        name = stack.pop()
+        if name in visited:
+            continue
+        visited.add(name)
+
+        info = get_info(name)
+        if info is None:
+            continue
+
+        mutated |= _ensure_entry(
+            name,
+            info,
+            elements,
+            auto_id_attrs=auto_id_attrs,
+            auto_id_required=auto_id_required,
+        )
+
+        # Visit required children next, in XSD order.  Children already
+        # visited would only be popped and discarded, so skip them here.
+        stack.extend(c.name for c in reversed(info.required_children) if c.name not in visited)
 
+    return mutated
+
+
+def _ensure_entry(
+    elem_name: str,
+    info: ElementInfo,
+    elements: dict[str, Any],
+    *,
+    auto_id_attrs: Sequence[str] | None,
+    auto_id_required: bool,
+) -> bool:
+    """Create or complete the profile entry for a single element.
+
+    Returns ``True`` if the entry was added or changed.
+    """
     # Build the set of identity attributes to auto-add for this element
     _id_attrs_for_elem: list[str] = []
     if auto_id_attrs:
-        supported = {a.name for a in info.attributes}
+        supported = info.attributes_by_name
         _id_attrs_for_elem = [a for a in auto_id_attrs if a in supported]
 
     # Ensure element entry exists
     if elem_name not in elements:
         entry: dict = {}
         # Add required attributes + auto-add identity attributes
-        req_attrs = [a for a in info.attributes if a.required]
+        req_attrs = info.required_attributes
         all_attrs_to_add = list(req_attrs)
         # Add identity attrs that are not already required
         req_names = {a.name for a in req_attrs}
         for id_name in _id_attrs_for_elem:
             if id_name not in req_names:
-                id_attr = next((a for a in info.attributes if a.name == id_name), None)
-                if id_attr:
-                    all_attrs_to_add.append(id_attr)
+                all_attrs_to_add.append(info.attributes_by_name[id_name])
 
         if all_attrs_to_add:
             entry["attributes"] = {}
@@ -177,50 +275,34 @@ def _recursive_add(
                 )
                 attr_entry: dict = {"required": req_val}
                 if attr.enum_values:
-                    attr_entry["values"] = list(attr.enum_values)
+                    attr_entry["values"] = attr.enum_values
                 entry["attributes"][attr.name] = attr_entry
 
-        # Add required children as dict with cardinality
-        req_children = [c for c in info.children if c.required]
-        # Build exclusive choice branches if element has exclusive groups
-        choice_groups = schema.get_choice_groups(elem_name)
-        exclusive_cg = None
-        for cg in choice_groups:
-            if cg.exclusive:
-                exclusive_cg = cg
-                break
-
-        if req_children or exclusive_cg:
-            child_dict: dict = {}
-            exclusive_members = exclusive_cg.all_elements if exclusive_cg else frozenset()
-            for c in req_children:
-                if c.name not in exclusive_members:
-                    child_dict[c.name] = c.cardinality
-            if exclusive_cg:
-                choice_dict: dict[str, str | None] = {}
-                for branch in exclusive_cg.branches:
-                    for c in info.children:
-                        if c.name in branch.elements and c.required:
-                            choice_dict[c.name] = c.cardinality
-                if choice_dict:
-                    child_dict["choice"] = choice_dict
-            if child_dict:
-                entry["children"] = child_dict
+        # Add required children as dict with cardinality; those inside
+        # an exclusive choice group go under a ``choice:`` key
+        child_dict: dict[str, Any] = {c.name: c.cardinality for c in info.plain_required_children}
+        if info.exclusive_required_children:
+            child_dict["choice"] = {c.name: c.cardinality for c in info.exclusive_required_children}
+        if child_dict:
+            entry["children"] = child_dict
 
         elements[elem_name] = entry if entry else None
+        return True
 
     else:
         # Element exists — ensure required children and attrs are present
         existing = elements[elem_name]
-        req_children = [c for c in info.children if c.required]
-        req_attrs = [a for a in info.attributes if a.required]
+        req_children = info.required_children
+        req_attrs = info.required_attributes
 
+        mutated = False
         # Only promote None → dict when there's something to add
         if existing is None and (req_children or req_attrs or _id_attrs_for_elem):
             existing = {}
             elements[elem_name] = existing
+            mutated = True
 
-        if isinstance(existing, dict):
+        if type(existing) is dict:
             # Ensure required attributes
             if req_attrs or _id_attrs_for_elem:
                 attrs_dict = existing.setdefault("attributes", {})
@@ -228,83 +310,129 @@ def _recursive_add(
                     if attr.name not in attrs_dict:
                         attr_entry: dict = {"required": True}
                         if attr.enum_values:
-                            attr_entry["values"] = list(attr.enum_values)
+                            attr_entry["values"] = attr.enum_values
                         attrs_dict[attr.name] = attr_entry
+                        mutated = True
                 # Auto-add identity attributes
                 for id_name in _id_attrs_for_elem:
                     if id_name not in attrs_dict:
-                        id_attr = next((a for a in info.attributes if a.name == id_name), None)
-                        if id_attr:
-                            attrs_dict[id_name] = {"required": auto_id_required}
+                        attrs_dict[id_name] = {"required": auto_id_required}
+                        mutated = True
 
             # Ensure required children (dict format)
             if req_children:
                 child_dict = existing.get("children", {})
                 if child_dict is None:
                     child_dict = {}
-                if not isinstance(child_dict, dict):
+                if type(child_dict) is not dict:
                     child_dict = {}
                 for c in req_children:
                     if c.name not in child_dict:
                         child_dict[c.name] = c.cardinality
+                        mutated = True
                 if child_dict:
                     existing["children"] = child_dict
 
-    # Recurse into required children
-    if info:
-        for child in info.children:
-            if child.required:
-                _recursive_add(
-                    schema,
-                    child.name,
-                    elements,
-                    visited,
-                    auto_id_attrs=auto_id_attrs,
-                    auto_id_required=auto_id_required,
-                )
+        return mutated
 
 
 def _ensure_akomantoso_root(
     profile: dict,
     elements: dict,
     schema: AknSchema,
-) -> None:
-    """Ensure ``akomaNtoso`` exists with document-type children and is
-    listed first in the elements dict.
+) -> bool:
+    """Ensure ``akomaNtoso`` exists with document-type children.
 
     ``akomaNtoso`` is the root element — every document type declared
-    in ``documentTypes`` should appear as a child, and the entry should
-    sit at the top of the ``elements`` section for readability.
+    in ``documentTypes`` should appear as a child.  Placing the entry at
+    the top of the ``elements`` section is left to
+    :func:`_apply_element_order`, which always ranks it first.
+
+    Returns ``True`` if the entry was added or changed.
     """
     doc_types: list[str] = profile.get("documentTypes", []) or []
     # Only keep document types that actually have element definitions
     present_doc_types = [dt for dt in doc_types if dt in elements]
 
     # Build / update akomaNtoso entry
+    original = elements.get("akomaNtoso", _MISSING)
     akn_entry = elements.get("akomaNtoso")
+    mutated = False
     if akn_entry is None:
         akn_entry = {}
-    if not isinstance(akn_entry, dict):
+    if type(akn_entry) is not dict:
         akn_entry = {}
 
     if present_doc_types:
         children = akn_entry.get("children", {}) or {}
-        if not isinstance(children, dict):
+        if type(children) is not dict:
             children = {}
         for dt in present_doc_types:
             if dt not in children:
                 children[dt] = "1..1"
+                mutated = True
         if children:
             akn_entry["children"] = children
 
-    elements["akomaNtoso"] = akn_entry or None
+    new_entry = akn_entry or None
+    mutated |= new_entry is not original
+    elements["akomaNtoso"] = new_entry
+    return mutated
+
+
+# ------------------------------------------------------------------
+# Profile reference graph
+# ------------------------------------------------------------------
+
 
-    # Move akomaNtoso to the front
-    if "akomaNtoso" in elements:
-        reordered = {"akomaNtoso": elements.pop("akomaNtoso")}
-        reordered.update(elements)
-        elements.clear()
-        elements.update(reordered)
+@dataclasses.dataclass
+class _ProfileIndex:
+    """Parent/child references between the entries of a profile's
+    ``elements`` section, built in a single pass.
+
+    Build it once with :meth:`build` and pass it to
+    :func:`compute_element_order` / :func:`_collect_descendants` to
+    avoid re-walking the profile.  Reordering keys or values in place
+    keeps it valid; adding or removing elements does not.
+    """
+
+    elem_set: set[str]
+    """Names of all elements defined in the profile."""
+
+    children_of: dict[str, tuple[str, ...]]
+    """In-profile children of each element (``children:`` and ``choice:``)."""
+
+    parents_of: dict[str, tuple[str, ...]]
+    """Inverse of ``children_of``."""
+
+    ref_count: dict[str, int]
+    """How many elements list each name as a top-level ``children:`` key."""
+
+    @classmethod
+    def build(cls, elements: dict[str, Any]) -> _ProfileIndex:
+        elem_set = set(elements)
+        children_of: dict[str, list[str]] = defaultdict(list)
+        parents_of: dict[str, list[str]] = defaultdict(list)
+        ref_count: dict[str, int] = defaultdict(int)
+        for ename, _edata, child_dict in _iter_child_refs(elements):
+            for cname in child_dict:
+                ref_count[cname] += 1
+                if cname == "choice":
+                    choice_dict = child_dict.get("choice")
+                    if type(choice_dict) is dict:
+                        for branch_name in choice_dict:
+                            if branch_name in elem_set:
+                                children_of[ename].append(branch_name)
+                                parents_of[branch_name].append(ename)
+                elif cname in elem_set:
+                    children_of[ename].append(cname)
+                    parents_of[cname].append(ename)
+        return cls(
+            elem_set,
+            {k: tuple(v) for k, v in children_of.items()},
+            {k: tuple(v) for k, v in parents_of.items()},
+            ref_count,
+        )
 
 
 # ------------------------------------------------------------------
@@ -312,7 +440,12 @@ def _ensure_akomantoso_root(
 # ------------------------------------------------------------------
 
 
-def compute_element_order(elements: dict, schema: AknSchema) -> list[str]:
+def compute_element_order(
+    elements: dict[str, Any],
+    schema: AknSchema,
+    *,
+    index: _ProfileIndex | None = None,
+) -> list[str]:
     """Compute a canonical ordering for profile element keys.
 
     Ordering principles:
@@ -325,133 +458,125 @@ def compute_element_order(elements: dict, schema: AknSchema) -> list[str]:
        alphabetically.
 
     Only relationships *within the profile* are considered — the full
-    XSD hierarchy is not imposed.
+    XSD hierarchy is not imposed.  A prebuilt *index* of *elements* is
+    used when given.
     """
     if not elements:
         return []
 
-    elem_set = set(elements)
-
-    # Build an in-profile parent→children graph.  A child is anything
-    # referenced in an element's children: or choice: section.
-    children_of: dict[str, list[str]] = defaultdict(list)
-    parents_of: dict[str, list[str]] = defaultdict(list)
-    for ename, edata in elements.items():
-        if not isinstance(edata, dict):
-            continue
-        child_dict = edata.get("children")
-        if isinstance(child_dict, dict):
-            for cname in child_dict:
-                if cname == "choice":
-                    choice_dict = child_dict.get("choice")
-                    if isinstance(choice_dict, dict):
-                        for branch_name in choice_dict:
-                            if branch_name in elem_set:
-                                children_of[ename].append(branch_name)
-                                parents_of[branch_name].append(ename)
-                elif cname in elem_set:
-                    children_of[ename].append(cname)
-                    parents_of[cname].append(ename)
+    # In-profile parent→children graph.  A child is anything referenced
+    # in an element's children: or choice: section.
+    if index is None:
+        index = _ProfileIndex.build(elements)
+    elem_set = index.elem_set
+    children_of = index.children_of
+    parents_of = index.parents_of
 
     # Topological sort via Kahn's algorithm.  For each element we
     # track in-degree (number of unprocessed parents in the profile).
-    in_degree: dict[str, int] = {e: 0 for e in elem_set}
-    for ename in elem_set:
-        in_degree[ename] = len(parents_of.get(ename, []))
-
-    # Roots: elements with no parents in the profile.
-    # Sort initially so alphabetical tiebreaking is deterministic.
-    ready = sorted([e for e in elem_set if in_degree[e] == 0])
-    # Ensure akomaNtoso is always first
-    if "akomaNtoso" in ready:
-        ready.remove("akomaNtoso")
-        ready.insert(0, "akomaNtoso")
+    in_degree = {e: len(parents_of.get(e, ())) for e in elem_set}
+
+    # Roots: elements with no parents in the profile.  ``ready`` is a
+    # min-heap of ``(priority, name)`` so alphabetical tiebreaking is
+    # deterministic; akomaNtoso gets priority 0 so it is always first.
+    ready = [(0 if e == "akomaNtoso" else 1, e) for e in elem_set if in_degree[e] == 0]
+    heapq.heapify(ready)
 
     ordered: list[str] = []
     while ready:
         # Pop the first ready element (alphabetical among peers)
-        current = ready.pop(0)
+        current = heapq.heappop(ready)[1]
         ordered.append(current)
-        # Decrement in-degree for children
-        for child in sorted(children_of.get(current, [])):
+        # Decrement in-degree for children (the heap orders them)
+        for child in children_of.get(current, ()):
             in_degree[child] -= 1
             if in_degree[child] == 0:
-                # Insert in sorted position among other ready items
-                _insert_sorted(ready, child)
+                heapq.heappush(ready, (1, child))
 
     # Any remaining elements (cycles or disconnected) appended
     # alphabetically.
-    remaining = sorted(e for e in elem_set if e not in set(ordered))
+    placed = set(ordered)
+    remaining = sorted(e for e in elem_set if e not in placed)
     ordered.extend(remaining)
 
     return ordered
 
 
-def _insert_sorted(lst: list[str], item: str) -> None:
-    """Insert *item* into *lst* maintaining alphabetical order."""
-    for i, v in enumerate(lst):
-        if item < v:
-            lst.insert(i, item)
-            return
-    lst.append(item)
+def _apply_element_order(
+    elements: dict[str, Any],
+    schema: AknSchema,
+    *,
+    index: _ProfileIndex | None = None,
+) -> bool:
+    """Reorder *elements* dict in-place to canonical order.
+
+    Returns ``True`` if the order changed.
+    """
+    order = compute_element_order(elements, schema, index=index)
+    # Keys up to the first mismatch (typically ``akomaNtoso`` and the
+    # document type) are already in place; only the tail is re-inserted.
+    for i, (want, have) in enumerate(zip(order, elements, strict=True)):
+        if want != have:
+            _move_to_end(elements, order[i:])
+            return True
+    return False
 
 
-def _apply_element_order(elements: dict, schema: AknSchema) -> None:
-    """Reorder *elements* dict in-place to canonical order."""
-    order = compute_element_order(elements, schema)
-    reordered = {name: elements[name] for name in order if name in elements}
-    elements.clear()
-    elements.update(reordered)
+def _move_to_end(data: dict[str, Any], keys: Iterable[str]) -> None:
+    """Re-insert *keys* of *data* at the end, in iteration order.
+
+    Plain dicts have no ``move_to_end``; popping and re-inserting each
+    key reorders in place without allocating a replacement dict.
+    """
+    for k in keys:
+        data[k] = data.pop(k)
 
 
 def reorder_children(children: dict, element_name: str, schema: AknSchema) -> dict:
-    """Reorder a children dict to match XSD field order.
+    """Reorder a children dict in place to match XSD field order.
 
     Required children come first (in XSD order), then optional
-    children (in XSD order), then ``choice:`` at the end.
+    children (in XSD order), then ``choice:`` at the end.  Returns
+    *children* for convenience.
     """
     info = schema.get_element_info(element_name)
     if info is None:
         return children
 
-    # Build an ordered list of child names from XSD
-    xsd_order = {c.name: (0 if c.required else 1, i) for i, c in enumerate(info.children)}
+    xsd_order = info.xsd_child_rank
 
-    reordered: dict = {}
     # Sort child entries by XSD order, with unknown keys at the end
     sorted_keys = sorted(
         (k for k in children if k != "choice"),
         key=lambda k: xsd_order.get(k, (2, 999)),
     )
-    for k in sorted_keys:
-        reordered[k] = children[k]
+    _move_to_end(children, sorted_keys)
     # choice: always last
     if "choice" in children:
         choice_data = children["choice"]
-        if isinstance(choice_data, dict):
+        if type(choice_data) is dict:
             # Also reorder choice entries by XSD order
-            sorted_choice = sorted(
-                choice_data,
-                key=lambda k: xsd_order.get(k, (2, 999)),
-            )
-            reordered["choice"] = {k: choice_data[k] for k in sorted_choice}
-        else:
-            reordered["choice"] = choice_data
-    return reordered
+            _move_to_end(choice_data, sorted(choice_data, key=lambda k: xsd_order.get(k, (2, 999))))
+        _move_to_end(children, ("choice",))
+    return children
 
 
 def reorder_attributes(attributes: dict, element_name: str, schema: AknSchema) -> dict:
-    """Reorder an attributes dict: required first (XSD order), then optional (XSD order)."""
+    """Reorder an attributes dict in place: required first (XSD order), then optional.
+
+    Returns *attributes* for convenience.
+    """
     info = schema.get_element_info(element_name)
     if info is None:
         return attributes
 
-    xsd_order = {a.name: (0 if a.required else 1, i) for i, a in enumerate(info.attributes)}
+    xsd_order = info.xsd_attr_rank
     sorted_keys = sorted(
         attributes,
         key=lambda k: xsd_order.get(k, (2, 999)),
     )
-    return {k: attributes[k] for k in sorted_keys}
+    _move_to_end(attributes, sorted_keys)
+    return attributes
 
 
 def reorder_profile(yaml_text: str, schema: AknSchema) -> str:
@@ -463,7 +588,7 @@ def reorder_profile(yaml_text: str, schema: AknSchema) -> str:
 
     Returns the modified YAML text.
     """
-    raw = yaml.safe_load(yaml_text)
+    raw = _load(yaml_text)
     if not isinstance(raw, dict) or "profile" not in raw:
         return yaml_text
 
@@ -475,17 +600,25 @@ def reorder_profile(yaml_text: str, schema: AknSchema) -> str:
     if not isinstance(elements, dict):
         return yaml_text
 
-    # Reorder children and attributes within each element
+    # Reordering within entries keeps the reference graph valid, so it
+    # is built once up front.
+    index = _ProfileIndex.build(elements)
+
+    # Reorder children and attributes within each element.  This stays
+    # serial: the work is short, GIL-bound Python sorting per element, so
+    # a thread pool would only add dispatch overhead.
     for ename, edata in elements.items():
-        if not isinstance(edata, dict):
+        if type(edata) is not dict:
             continue
-        if "children" in edata and isinstance(edata["children"], dict):
-            edata["children"] = reorder_children(edata["children"], ename, schema)
-        if "attributes" in edata and isinstance(edata["attributes"], dict):
-            edata["attributes"] = reorder_attributes(edata["attributes"], ename, schema)
+        children = edata.get("children")
+        if type(children) is dict:
+            reorder_children(children, ename, schema)
+        attributes = edata.get("attributes")
+        if type(attributes) is dict:
+            reorder_attributes(attributes, ename, schema)
 
     # Reorder elements themselves
-    _apply_element_order(elements, schema)
+    _apply_element_order(elements, schema, index=index)
 
     return _dump(raw)
 
@@ -505,9 +638,21 @@ def collapse_element(
     An element is orphaned if no other element in the profile lists it
     as a child.
 
-    Returns the modified YAML text.
+    Returns the modified YAML text, or *yaml_text* itself when the
+    element is neither defined nor referenced.
     """
-    raw = yaml.safe_load(yaml_text)
+    return _collapse_cached(yaml_text, element_name, schema)
+
+
+@functools.lru_cache(maxsize=128)
+def _collapse_cached(yaml_text: str, element_name: str, schema: AknSchema) -> str:
+    """Memoised body of :func:`collapse_element` (see :func:`_expand_cached`)."""
+    # Any definition of or reference to the element spells out its name;
+    # without one there is nothing to remove and no need to parse.
+    if element_name not in yaml_text:
+        return yaml_text
+
+    raw = _load(yaml_text)
     if not isinstance(raw, dict) or "profile" not in raw:
         return yaml_text
 
@@ -520,24 +665,29 @@ def collapse_element(
         return yaml_text
 
     # Collect the element and all its descendants
-    to_remove = _collect_descendants(element_name, elements, schema)
-
-    # Remove references from other elements' children dicts
-    for e_name, e_data in list(elements.items()):
-        if not isinstance(e_data, dict):
+    to_remove = frozenset(_collect_descendants(element_name, elements, schema))
+
+    # Remove references from other elements' children dicts (in place —
+    # most entries reference none of the removed elements)
+    mutated = False
+    for _e_name, e_data, child_dict in _iter_child_refs(elements):
+        doomed = [k for k in child_dict if k in to_remove and k != "choice"]
+        if not doomed:
             continue
-        child_dict = e_data.get("children")
-        if isinstance(child_dict, dict):
-            e_data["children"] = {
-                k: v for k, v in child_dict.items() if k not in to_remove or k == "choice"
-            }
-            if not e_data["children"]:
-                del e_data["children"]
+        for k in doomed:
+            del child_dict[k]
+        if not child_dict:
+            del e_data["children"]
+        mutated = True
 
     # Remove the elements themselves
     for name in to_remove:
-        elements.pop(name, None)
+        if name in elements:
+            del elements[name]
+            mutated = True
 
+    if not mutated:
+        return yaml_text
     return _dump(raw)
 
 
@@ -545,10 +695,16 @@ def _collect_descendants(
     elem_name: str,
     elements: dict,
     schema: AknSchema,
+    *,
+    index: _ProfileIndex | None = None,
 ) -> set[str]:
     """Collect *elem_name* and all descendants that would become orphaned."""
+    if index is None:
+        index = _ProfileIndex.build(elements)
     to_remove: set[str] = {elem_name}
-    _walk_orphans(elem_name, elements, schema, to_remove)
+    # _walk_orphans consumes the counts — keep the index reusable
+    ref_count = defaultdict(int, index.ref_count)
+    _walk_orphans(elem_name, elements, schema, to_remove, ref_count)
     return to_remove
 
 
@@ -557,37 +713,35 @@ def _walk_orphans(
     elements: dict,
     schema: AknSchema,
     to_remove: set[str],
+    ref_count: dict[str, int],
 ) -> None:
-    """Recursively find orphaned children."""
-    entry = elements.get(elem_name)
-    if not isinstance(entry, dict):
-        return
-
-    children = entry.get("children", {})
-    if not isinstance(children, dict):
-        return
+    """Find orphaned descendants of *elem_name* with an explicit stack.
 
-    for child_name in children:
-        if child_name in to_remove:
+    *ref_count* is decremented for every child of an element that is
+    being removed; a child whose count reaches zero is no longer
+    referenced by any surviving element.
+    """
+    stack = [elem_name]
+    while stack:
+        entry = elements.get(stack.pop())
+        if type(entry) is not dict:
             continue
-        # Skip meta-keys that are not child element references
-        if child_name == "choice":
+
+        children = entry.get("children", {})
+        if type(children) is not dict:
             continue
-        # Check if any other element (not being removed) also references this child
-        is_orphan = True
-        for other_name, other_data in elements.items():
-            if other_name in to_remove:
+
+        for child_name in children:
+            ref_count[child_name] -= 1
+            if child_name in to_remove:
                 continue
-            if not isinstance(other_data, dict):
+            # Skip meta-keys that are not child element references
+            if child_name == "choice":
                 continue
-            other_children = other_data.get("children", {})
-            if isinstance(other_children, dict) and child_name in other_children:
-                is_orphan = False
-                break
 
-        if is_orphan and child_name in elements:
-            to_remove.add(child_name)
-            _walk_orphans(child_name, elements, schema, to_remove)
+            if ref_count[child_name] <= 0 and child_name in elements:
+                to_remove.add(child_name)
+                stack.append(child_name)
 
 
 # ------------------------------------------------------------------
@@ -595,8 +749,50 @@ def _walk_orphans(
 # ------------------------------------------------------------------
 
 
+def _iter_child_refs(
+    elements: dict[str, Any],
+) -> Iterator[tuple[str, dict[str, Any], dict[str, Any]]]:
+    """Yield ``(name, entry, children)`` for entries with a ``children:`` mapping.
+
+    Uses exact ``type(...) is dict`` checks: the YAML loader only ever
+    produces plain dicts, and this skips the ``isinstance`` MRO walk in
+    loops that touch every element.
+    """
+    for name, entry in elements.items():
+        if type(entry) is dict:
+            children = entry.get("children")
+            if type(children) is dict:
+                yield name, entry, children
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_cached(yaml_text: str) -> Any:
+    """Parse *yaml_text* once per distinct input (shared — never mutate)."""
+    return yaml.load(yaml_text, Loader=_SafeLoader)
+
+
+def _load(yaml_text: str) -> Any:
+    """Parse *yaml_text* into a private, mutable tree.
+
+    Every profile-rewriting command (the cascade operations here and the
+    server's identity-attribute and child-removal edits) goes through
+    this function, so consecutive commands on the same document text
+    (e.g. a diff preview followed by the apply) share one cached parse;
+    the deep copy is roughly an order of magnitude cheaper than
+    re-parsing.
+    """
+    return copy.deepcopy(_parse_cached(yaml_text))
+
+
 def _dump(data: dict) -> str:
-    """Dump the modified profile back to YAML with readable blank lines."""
+    """Dump the modified profile back to YAML with readable blank lines.
+
+    The blank lines are added by a regex pass over the emitted text
+    rather than by hooking the emitter: libyaml's C emitter exposes no
+    per-line callbacks and has no event for blank lines, and switching
+    to the pure-Python emitter to get them costs far more than the
+    post-pass (~10% of the dump on a large profile).
+    """
     raw = yaml.dump(
         data,
         Dumper=_ProfileDumper,
@@ -617,43 +813,8 @@ def _insert_blank_lines(text: str) -> str:
     - Blank line before each element entry (4-space indent key inside
       the ``elements:`` block).
     """
-    _SECTION_KEYS = {"documentTypes:", "elements:"}
-    lines = text.splitlines(True)  # keep newlines
-    out: list[str] = []
-    in_elements = False
-
-    for i, line in enumerate(lines):
-        stripped = line.rstrip("\n")
-
-        # Detect entering the elements section
-        if stripped == "  elements:":
-            in_elements = True
-        elif (
-            stripped
-            and not stripped.startswith(" ")
-            or in_elements
-            and stripped
-            and not stripped.startswith("  ")
-        ):
-            in_elements = False
-
-        # Blank line before major profile sections (documentTypes, elements)
-        if i > 0 and stripped.startswith("  ") and not stripped.startswith("   "):
-            key_part = stripped.strip().split(":")[0] + ":"
-            if key_part in _SECTION_KEYS:
-                prev = out[-1].rstrip("\n") if out else ""
-                if prev:
-                    out.append("\n")
-
-        # Blank line before each element entry (4-space indent keys under elements)
-        if in_elements and i > 0 and len(stripped) > 4:
-            if stripped.startswith("    ") and not stripped.startswith("     "):
-                key_part = stripped.lstrip()
-                if key_part.endswith(":") or ": " in key_part:
-                    prev = out[-1].rstrip("\n") if out else ""
-                    if prev and prev != "  elements:":
-                        out.append("\n")
-
-        out.append(line)
-
-    return "".join(out)
+    text = _SECTION_BREAK_RE.sub("\n", text)
+    return _ELEMENTS_BLOCK_RE.sub(
+        lambda m: m.group(1) + _ELEMENT_BREAK_RE.sub("\n", m.group(2)),
+        text,
+    )
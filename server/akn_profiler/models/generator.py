@@ -21,6 +21,7 @@ Public API::
 
 from __future__ import annotations
 
+import functools
 import logging
 from typing import TYPE_CHECKING
 
@@ -31,7 +32,7 @@ from akn_profiler.models.profile import (
 )
 
 if TYPE_CHECKING:
-    from akn_profiler.xsd.schema_loader import AknSchema, AttrInfo
+    from akn_profiler.xsd.schema_loader import AknSchema, ElementInfo
 
 logger = logging.getLogger(__name__)
 
@@ -69,13 +70,15 @@ def generate_profile(
     -------
     A ``ProfileDocument`` that will pass validation with zero errors.
     """
-    valid_doc_types = schema.get_children("akomaNtoso")
+    valid_doc_types = schema.document_types()
     if doc_type not in valid_doc_types:
-        raise ValueError(f"'{doc_type}' is not a valid AKN document type. Valid: {valid_doc_types}")
+        raise ValueError(
+            f"'{doc_type}' is not a valid AKN document type. Valid: {list(valid_doc_types)}"
+        )
 
     elements: dict[str, ElementRestriction] = {}
 
-    # Recursively walk the required-child tree starting from the doc type
+    # Walk the required-child tree starting from the doc type
     _walk_required_tree(
         schema,
         elem_name=doc_type,
@@ -94,7 +97,8 @@ def generate_profile(
         include_optional_attributes=include_optional_attributes,
     )
 
-    return ProfileDocument(
+    # Every value below comes from the schema walk, so skip validation
+    return ProfileDocument.model_construct(
         name=f"Minimum viable profile ({doc_type})",
         version="1.0",
         description=(f"Minimum viable application profile for the {doc_type} document type."),
@@ -118,7 +122,29 @@ def generate_yaml(
     comments:
         If ``True``, add inline ``# comments`` with XSD context
         (attribute type, enum values, whether optional).
+
+    The output is deterministic for a given schema and arguments, so
+    results are memoised; the schema is part of the key (by identity),
+    so a reloaded schema is never served stale text.
     """
+    return _generate_yaml_cached(
+        schema,
+        doc_type,
+        include_optional_children,
+        include_optional_attributes,
+        comments,
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _generate_yaml_cached(
+    schema: AknSchema,
+    doc_type: str,
+    include_optional_children: bool,
+    include_optional_attributes: bool,
+    comments: bool,
+) -> str:
+    """Memoised body of :func:`generate_yaml`."""
     profile = generate_profile(
         schema,
         doc_type,
@@ -133,7 +159,7 @@ def generate_yaml(
 
 
 # ------------------------------------------------------------------
-# Recursive XSD walker
+# XSD walker
 # ------------------------------------------------------------------
 
 
@@ -146,38 +172,35 @@ def _walk_required_tree(
     include_optional_attributes: bool,
     visited: set[str],
 ) -> None:
-    """Recursively walk the required-child chain of *elem_name*.
+    """Walk the required-child chain of *elem_name*.
 
-    For each element encountered, create an ``ElementRestriction`` and
-    recurse into its required children.
+    For each element encountered, create an ``ElementRestriction``, then
+    visit its required children.  The walk is depth-first in XSD order,
+    driven by an explicit stack rather than recursion.
     """
-    if elem_name in visited:
-        return
-    visited.add(elem_name)
-
-    info = schema.get_element_info(elem_name)
-    if info is None:
-        return
-
-    _add_element(
-        schema,
-        elem_name,
-        elements,
-        include_optional_children=include_optional_children,
-        include_optional_attributes=include_optional_attributes,
-    )
-
-    # Recurse into required children
-    for child in schema.get_required_children(elem_name):
-        _walk_required_tree(
+    get_info = schema.get_element_info
+    stack = [elem_name]
+    while stack:
+        name = stack.pop()
+        if name in visited:
+            continue
+        visited.add(name)
+
+        info = get_info(name)
+        if info is None:
+            continue
+
+        _add_element(
             schema,
-            child.name,
+            name,
             elements,
             include_optional_children=include_optional_children,
             include_optional_attributes=include_optional_attributes,
-            visited=visited,
+            info=info,
         )
 
+        stack.extend(c.name for c in reversed(info.required_children) if c.name not in visited)
+
 
 def _add_element(
     schema: AknSchema,
@@ -186,63 +209,43 @@ def _add_element(
     *,
     include_optional_children: bool,
     include_optional_attributes: bool,
+    info: ElementInfo | None = None,
 ) -> None:
-    """Add an ``ElementRestriction`` for *elem_name*."""
-    info = schema.get_element_info(elem_name)
+    """Add an ``ElementRestriction`` for *elem_name*.
+
+    Callers that already hold the ``ElementInfo`` pass it as *info* to
+    skip a second schema lookup.
+    """
     if info is None:
-        return
+        info = schema.get_element_info(elem_name)
+        if info is None:
+            return
 
     # Attributes
     attrs: dict[str, AttributeRestriction] = {}
     for a in info.attributes:
         if a.required or include_optional_attributes:
-            restriction = AttributeRestriction(required=a.required)
             # Include enum values so the profile documents what's allowed
-            if a.enum_values:
-                restriction = AttributeRestriction(
-                    required=a.required,
-                    values=list(a.enum_values),
-                )
-            attrs[a.name] = restriction
-
-    # Children — dict mapping child name → cardinality string
-    children: dict[str, str | None] = {}
-    exclusive: dict[str, str | None] = {}
-
-    # Check for exclusive choice groups
-    choice_groups = schema.get_choice_groups(elem_name)
-    exclusive_cg = None
-    for cg in choice_groups:
-        if cg.exclusive:
-            exclusive_cg = cg
-            break
-
-    if exclusive_cg is not None:
-        # Build children: always-present elements (not in exclusive branches)
-        exclusive_members = exclusive_cg.all_elements
-        if include_optional_children:
-            children = {
-                c.name: c.cardinality for c in info.children if c.name not in exclusive_members
-            }
-        else:
-            children = {
-                c.name: c.cardinality
-                for c in info.children
-                if c.required and c.name not in exclusive_members
-            }
-        # Build exclusive dict
-        for branch in exclusive_cg.branches:
-            for c in info.children:
-                if c.name in branch.elements:
-                    if c.required or include_optional_children:
-                        exclusive[c.name] = c.cardinality
+            attrs[a.name] = AttributeRestriction.model_construct(
+                required=a.required,
+                values=list(a.enum_values),
+            )
+
+    # Children — dict mapping child name → cardinality string.  Members
+    # of an exclusive choice group go into ``exclusive`` instead; the
+    # required-only split is precomputed on ``ElementInfo``.
+    children: dict[str, str | None]
+    exclusive: dict[str, str | None]
+    if include_optional_children:
+        exclusive_cg = info.exclusive_choice
+        exclusive_members = exclusive_cg.all_elements if exclusive_cg else frozenset()
+        children = {c.name: c.cardinality for c in info.children if c.name not in exclusive_members}
+        exclusive = {c.name: c.cardinality for c in info.exclusive_choice_children}
     else:
-        if include_optional_children:
-            children = {c.name: c.cardinality for c in info.children}
-        else:
-            children = {c.name: c.cardinality for c in info.children if c.required}
+        children = {c.name: c.cardinality for c in info.plain_required_children}
+        exclusive = {c.name: c.cardinality for c in info.exclusive_required_children}
 
-    elements[elem_name] = ElementRestriction(
+    elements[elem_name] = ElementRestriction.model_construct(
         attributes=attrs,
         children=children,
         exclusive_children=exclusive,
@@ -340,7 +343,7 @@ def _to_commented_yaml(profile: ProfileDocument, schema: AknSchema) -> str:
 
     # Document types
     if profile.documentTypes:
-        valid_doc_types = schema.get_children("akomaNtoso")
+        valid_doc_types = schema.document_types()
         lines.append(f"  # Valid document types: {', '.join(valid_doc_types)}")
         lines.append("  documentTypes:")
         for dt in profile.documentTypes:
@@ -364,7 +367,7 @@ def _to_commented_yaml(profile: ProfileDocument, schema: AknSchema) -> str:
             if restriction.attributes:
                 lines.append("      attributes:")
                 for attr_name, attr_r in restriction.attributes.items():
-                    attr_info = _find_attr(schema, elem_name, attr_name)
+                    attr_info = info.attributes_by_name.get(attr_name) if info else None
                     comment = ""
                     if attr_info:
                         parts = []
@@ -386,9 +389,8 @@ def _to_commented_yaml(profile: ProfileDocument, schema: AknSchema) -> str:
 
             # Children
             if restriction.children or restriction.exclusive_children:
-                all_children = schema.get_children(elem_name) if info else []
-                req_names = {c.name for c in schema.get_required_children(elem_name)}
-                optional_names = [n for n in all_children if n not in req_names]
+                req_names = info.required_child_names if info else frozenset()
+                optional_names = info.optional_child_names if info else ()
                 if optional_names:
                     lines.append(
                         f"      # Also available: {', '.join(optional_names[:15])}"
@@ -414,11 +416,3 @@ def _to_commented_yaml(profile: ProfileDocument, schema: AknSchema) -> str:
             lines.append("")
 
     return "\n".join(lines) + "\n"
-
-
-def _find_attr(schema: AknSchema, elem_name: str, attr_name: str) -> AttrInfo | None:
-    """Look up an ``AttrInfo`` by element and attribute name."""
-    for a in schema.get_attributes(elem_name):
-        if a.name == attr_name:
-            return a
-    return None
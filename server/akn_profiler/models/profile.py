@@ -28,7 +28,20 @@ checks that prevent loosening XSD requirements).
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+import sys
+from itertools import chain
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+
+def _intern(value: object) -> object:
+    """Intern *value* when it is a ``str``; anything else passes through.
+
+    Element and attribute names recur throughout a profile.  Interned,
+    they share one object each, and dict lookups against the schema's
+    names can match on identity before comparing characters.
+    """
+    return sys.intern(value) if type(value) is str else value
 
 
 class AttributeRestriction(BaseModel):
@@ -46,11 +59,21 @@ class AttributeRestriction(BaseModel):
         XSD enum for that attribute).
     """
 
+    model_config = ConfigDict(frozen=True)
+
     required: bool = False
     """Whether this attribute is required by the profile."""
 
     values: list[str] = Field(default_factory=list)
 
+    @field_validator("values", mode="before")
+    @classmethod
+    def _intern_values(cls, v: object) -> object:
+        """Intern enum values — the same few strings recur across elements."""
+        if isinstance(v, list):
+            return [_intern(item) for item in v]
+        return v
+
 
 class ElementRestriction(BaseModel):
     """Restriction placed on a single AKN element.
@@ -87,6 +110,8 @@ class ElementRestriction(BaseModel):
         valid child of the previous one per the XSD.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     profileNote: str = ""
     """Curator annotation — explanatory text for readers of the profile."""
 
@@ -99,64 +124,52 @@ class ElementRestriction(BaseModel):
 
     @model_validator(mode="before")
     @classmethod
-    def _extract_choice(cls, data: object) -> object:
-        """Pop ``choice`` from the ``children`` dict.
+    def _preprocess(cls, data: object) -> object:
+        """Normalise a raw YAML element entry in a single pass.
 
         In YAML the user writes::
 
             children:
               num: "1..1"
+              body:           # bare key → None → XSD default
               choice:
                 section: "1..*"
                 subchapter: "1..*"
-
-        This validator moves the ``choice`` key out of ``children``
-        into ``exclusive_children`` so the ``children`` dict contains
-        only always-present child entries.
+            attributes:
+              name:           # bare key → None → {}
+
+        - ``choice`` is moved out of ``children`` into
+          ``exclusive_children`` so the ``children`` dict contains only
+          always-present child entries.  ``None`` child values stay
+          as-is (meaning "use XSD default cardinality").
+        - Bare attribute keys parse as ``None`` and are coerced to ``{}``.
+        - Child and attribute names are interned.
         """
         if not isinstance(data, dict):
             return data
-        children = data.get("children")
-        if isinstance(children, dict) and "choice" in children:
-            raw_choice = children.pop("choice")
-            if isinstance(raw_choice, dict):
-                data["exclusive_children"] = raw_choice
-            elif isinstance(raw_choice, list):
-                # Legacy list format: merge all branch dicts into one flat dict
-                merged: dict[str, str | None] = {}
-                for item in raw_choice:
-                    if isinstance(item, dict):
-                        merged.update(item)
-                data["exclusive_children"] = merged
-        return data
-
-    @field_validator("attributes", mode="before")
-    @classmethod
-    def _coerce_attr_none(cls, v: object) -> object:
-        """YAML bare keys (``name:``) parse as ``None`` — coerce to ``{}``."""
-        if isinstance(v, dict):
-            return {k: val if val is not None else {} for k, val in v.items()}
-        return v
-
-    @field_validator("children", mode="before")
-    @classmethod
-    def _coerce_children_none(cls, v: object) -> object:
-        """Accept both dict and list formats; bare values become ``None``.
 
-        Dict format (preferred)::
-
-            children:
-              meta: "1..1"
-              body:           # bare key → None → XSD default
-              choice:
-                section: "1..*"
-                subchapter: "1..*"
+        attributes = data.get("attributes")
+        if isinstance(attributes, dict):
+            data["attributes"] = {
+                _intern(k): val if val is not None else {} for k, val in attributes.items()
+            }
 
-        ``None`` values stay as-is (meaning "use XSD default cardinality").
-        """
-        if isinstance(v, dict):
-            return v  # already correct shape
-        return v
+        children = data.get("children")
+        if isinstance(children, dict):
+            data["children"] = {_intern(k): val for k, val in children.items() if k != "choice"}
+            if "choice" in children:
+                raw_choice = children["choice"]
+                if isinstance(raw_choice, list):
+                    # Legacy list format: merge all branch dicts into one flat dict
+                    data["exclusive_children"] = {
+                        _intern(k): val
+                        for k, val in chain.from_iterable(
+                            item.items() for item in raw_choice if isinstance(item, dict)
+                        )
+                    }
+                elif isinstance(raw_choice, dict):
+                    data["exclusive_children"] = {_intern(k): val for k, val in raw_choice.items()}
+        return data
 
 
 class ProfileDocument(BaseModel):
@@ -165,6 +178,8 @@ class ProfileDocument(BaseModel):
     Maps the top-level ``profile:`` key in the YAML.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     name: str = ""
     version: str = ""
     description: str = ""
@@ -180,5 +195,5 @@ class ProfileDocument(BaseModel):
     def _coerce_elem_none(cls, v: object) -> object:
         """YAML bare keys (``act:``) parse as ``None`` — coerce to ``{}``."""
         if isinstance(v, dict):
-            return {k: val if val is not None else {} for k, val in v.items()}
+            return {_intern(k): val if val is not None else {} for k, val in v.items()}
         return v
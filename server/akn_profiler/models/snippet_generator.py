@@ -21,10 +21,35 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from akn_profiler.xsd.schema_loader import AknSchema
 
+# Minimal scaffold — the cascade system (diagnostics + quick-fixes)
+# will guide the user to expand elements after the scaffold is
+# inserted.  This keeps the snippet small and the flow progressive:
+#
+#   1. Snippet inserts metadata + document type + akomaNtoso
+#   2. Diagnostic fires: "'act' has no element definition"
+#   3. Quick-fix: "Define 'act' with required attributes and children"
+#   4. One click → full cascade fills in all required elements
+#
+# Only the document type varies, so it is filled in with ``%`` (the
+# ``${N:...}`` tab stops rule out ``str.format``).
+_SNIPPET_TEMPLATE = (
+    "profile:\n"
+    '  name: "${1:Profile Name}"\n'
+    '  version: "${2:1.0}"\n'
+    '  description: "${3:Description of this application profile}"\n'
+    "\n"
+    "  documentTypes:\n"
+    "    - %s\n"
+    "\n"
+    "  elements:\n"
+    "    akomaNtoso:\n"
+    "$0"
+)
+
 
 def get_document_types(schema: AknSchema) -> list[str]:
     """Return the list of valid AKN document types."""
-    return schema.get_children("akomaNtoso")
+    return list(schema.document_types())
 
 
 def generate_snippet(schema: AknSchema, doc_type: str) -> str:
@@ -44,32 +69,11 @@ def generate_snippet(schema: AknSchema, doc_type: str) -> str:
     -------
     A string with VS Code snippet tab stops.
     """
-    # Build list of valid doc types for the choice placeholder
-    valid_types = get_document_types(schema)
+    valid_types = schema.document_types()
 
     if doc_type not in valid_types:
-        raise ValueError(f"'{doc_type}' is not a valid AKN document type. Valid: {valid_types}")
-
-    # Minimal scaffold — the cascade system (diagnostics + quick-fixes)
-    # will guide the user to expand elements after the scaffold is
-    # inserted.  This keeps the snippet small and the flow progressive:
-    #
-    #   1. Snippet inserts metadata + document type + akomaNtoso
-    #   2. Diagnostic fires: "'act' has no element definition"
-    #   3. Quick-fix: "Define 'act' with required attributes and children"
-    #   4. One click → full cascade fills in all required elements
-    lines = [
-        "profile:",
-        '  name: "${1:Profile Name}"',
-        '  version: "${2:1.0}"',
-        '  description: "${3:Description of this application profile}"',
-        "",
-        "  documentTypes:",
-        f"    - {doc_type}",
-        "",
-        "  elements:",
-        "    akomaNtoso:",
-        "$0",
-    ]
-
-    return "\n".join(lines)
+        raise ValueError(
+            f"'{doc_type}' is not a valid AKN document type. Valid: {list(valid_types)}"
+        )
+
+    return _SNIPPET_TEMPLATE % doc_type
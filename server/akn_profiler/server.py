@@ -27,15 +27,21 @@ Implementation roadmap:
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import difflib
 import functools
 import logging
 import re as _re
-from collections.abc import Callable
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Sequence
+from itertools import islice
+from operator import itemgetter
 from typing import Any, TypeVar
 
 import yaml
 from lsprotocol.types import (
+    COMPLETION_ITEM_RESOLVE,
     TEXT_DOCUMENT_CODE_ACTION,
     TEXT_DOCUMENT_CODE_LENS,
     TEXT_DOCUMENT_COMPLETION,
@@ -79,8 +85,17 @@ from lsprotocol.types import (
     WorkspaceEdit,
 )
 from pygls.lsp.server import LanguageServer
+from pygls.workspace import TextDocument
+
+try:  # Optional C++ fuzzy matcher — far faster than difflib on large pools
+    from rapidfuzz import fuzz as _fuzz
+    from rapidfuzz import process as _fuzz_process
+except ImportError:  # pragma: no cover — rapidfuzz not installed
+    _fuzz = None  # type: ignore[assignment, unused-ignore]
+    _fuzz_process = None  # type: ignore[assignment, unused-ignore]
 
 from akn_profiler.models.cascade import (
+    _load,
     _ProfileDumper,
     collapse_element,
     expand_element,
@@ -89,8 +104,8 @@ from akn_profiler.models.cascade import (
 from akn_profiler.models.snippet_generator import generate_snippet, get_document_types
 from akn_profiler.validation.engine import validate_profile
 from akn_profiler.validation.errors import Severity, ValidationError
-from akn_profiler.validation.yaml_context import Scope, resolve_context
-from akn_profiler.xsd.schema_loader import AknSchema
+from akn_profiler.validation.yaml_context import CursorContext, Scope, resolve_context
+from akn_profiler.xsd.schema_loader import AknSchema, AttrInfo
 
 # Configure logging
 logging.basicConfig(
@@ -112,6 +127,21 @@ _auto_add_wid: bool = True
 _auto_add_guid: bool = False
 _auto_id_required: bool = True
 
+# Diagnostics last published per document URI, so unchanged results are
+# not re-sent to the client
+_last_published: dict[str, tuple[Diagnostic, ...]] = {}
+
+# Seconds to wait after an edit before validating; further edits to the
+# same document within the window restart it, so a burst of keystrokes
+# is validated once, against its final text
+_VALIDATION_DELAY = 0.12
+_pending_validation: dict[str, asyncio.TimerHandle] = {}
+
+# Last code-action response per document URI with the request it answered;
+# editors re-ask on every cursor move and diagnostic refresh, so identical
+# requests against the same document version and settings are served from here
+_last_code_actions: dict[str, tuple[tuple[object, ...], list[CodeAction]]] = {}
+
 # Type variable for decorator
 _T = TypeVar("_T")
 
@@ -193,25 +223,48 @@ def shutdown() -> None:
 def did_open(params: DidOpenTextDocumentParams) -> None:
     """Handle document open events — validate and publish diagnostics."""
     doc = params.text_document
+    _cancel_pending_validation(doc.uri)
     _validate_and_publish(doc.uri, doc.text)
 
 
 @server.feature(TEXT_DOCUMENT_DID_CHANGE)
 def did_change(params: DidChangeTextDocumentParams) -> None:
-    """Handle document change events — re-validate."""
-    doc = params.text_document
-    # Get the latest full text from the server's workspace
-    text_doc = server.workspace.get_text_document(doc.uri)
-    _validate_and_publish(doc.uri, text_doc.source)
+    """Handle document change events — re-validate (debounced)."""
+    uri = params.text_document.uri
+    _cancel_pending_validation(uri)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:  # no event loop (called outside the server) — validate now
+        _validate_latest(uri)
+        return
+    _pending_validation[uri] = loop.call_later(_VALIDATION_DELAY, _validate_latest, uri)
 
 
 @server.feature(TEXT_DOCUMENT_DID_CLOSE)
 def did_close(params: DidCloseTextDocumentParams) -> None:
     """Handle document close events — clear diagnostics."""
     doc = params.text_document
+    _cancel_pending_validation(doc.uri)
+    _last_published.pop(doc.uri, None)
+    _last_code_actions.pop(doc.uri, None)
     server.text_document_publish_diagnostics(PublishDiagnosticsParams(uri=doc.uri, diagnostics=[]))
 
 
+def _cancel_pending_validation(uri: str) -> None:
+    """Drop the debounced validation scheduled for *uri*, if any."""
+    pending = _pending_validation.pop(uri, None)
+    if pending is not None:
+        pending.cancel()
+
+
+def _validate_latest(uri: str) -> None:
+    """Validate the workspace's current text for *uri*."""
+    _pending_validation.pop(uri, None)
+    # Get the latest full text from the server's workspace
+    text_doc = server.workspace.get_text_document(uri)
+    _validate_and_publish(uri, text_doc.source)
+
+
 # ------------------------------------------------------------------
 # Validation → LSP diagnostics bridge
 # ------------------------------------------------------------------
@@ -224,19 +277,37 @@ _SEVERITY_MAP = {
 
 
 def _validate_and_publish(uri: str, source: str) -> None:
-    """Run the validation engine and publish LSP diagnostics."""
+    """Run the validation engine and publish LSP diagnostics.
+
+    Nothing is sent when the diagnostics equal the last set published
+    for *uri* — most keystrokes do not change the findings, and a
+    re-publish makes the client serialise and re-render them all.
+    """
     if akn_schema is None:
         logger.warning("Schema not loaded yet — skipping validation")
         return
 
-    errors = validate_profile(source, akn_schema)
-    diagnostics = [_error_to_diagnostic(e) for e in errors]
+    diagnostics = _diagnostics_for(source, akn_schema)
+    if _last_published.get(uri) == diagnostics:
+        return
+    _last_published[uri] = diagnostics
 
     server.text_document_publish_diagnostics(
-        PublishDiagnosticsParams(uri=uri, diagnostics=diagnostics)
+        PublishDiagnosticsParams(uri=uri, diagnostics=list(diagnostics))
     )
 
 
+@functools.lru_cache(maxsize=8)
+def _diagnostics_for(source: str, schema: AknSchema) -> tuple[Diagnostic, ...]:
+    """Validate *source* and convert the findings to LSP diagnostics.
+
+    Memoised on the full text: editors re-send identical buffers (open
+    after close, undo/redo, save-triggered syncs), and those skip the
+    YAML parse, Pydantic validation and rule passes entirely.
+    """
+    return tuple(_error_to_diagnostic(e) for e in validate_profile(source, schema))
+
+
 def _error_to_diagnostic(error: ValidationError) -> Diagnostic:
     """Convert an internal ``ValidationError`` to an LSP ``Diagnostic``."""
     line = (error.line or 1) - 1  # LSP lines are 0-based
@@ -264,13 +335,18 @@ def start_server() -> None:
 # ==================================================================
 
 _PROFILE_KEYS = ["name", "version", "description", "documentTypes", "elements"]
-_ELEMENT_BODY_KEYS = ["profileNote", "attributes", "children", "structure"]
-_ATTRIBUTE_BODY_KEYS = ["required", "values"]
+# Keys inside an element body, in completion order, with their snippets
+_ELEMENT_BODY_SNIPPETS = {
+    "profileNote": 'profileNote: "$1"\n',
+    "attributes": "attributes:\n  $1:\n",
+    "children": "children:\n  $1:\n",
+    "structure": "structure:\n  - $1\n",
+}
 
 
 @server.feature(
     TEXT_DOCUMENT_COMPLETION,
-    CompletionOptions(trigger_characters=[":", "-", " ", "\n"]),
+    CompletionOptions(trigger_characters=[":", "-", " ", "\n"], resolve_provider=True),
 )
 @_safe_handler(CompletionList(is_incomplete=False, items=[]))
 def completion(params: CompletionParams) -> CompletionList:
@@ -279,319 +355,447 @@ def completion(params: CompletionParams) -> CompletionList:
         return CompletionList(is_incomplete=False, items=[])
 
     doc = server.workspace.get_text_document(params.text_document.uri)
-    ctx = resolve_context(doc.source, params.position.line, params.position.character)
-    items: list[CompletionItem] = []
+    # Space and newline are trigger characters, so every keystroke in a
+    # description or comment lands here; nothing is offered in free text.
+    if _in_free_text(doc.source, params.position.line, params.position.character):
+        return CompletionList(is_incomplete=False, items=[])
+    ctx = _context_at(doc.source, params.position.line, params.position.character)
 
-    existing = set(ctx.existing_keys)
+    existing = ctx.existing_keys
     # Cross-block exclusion: prevent adding the same element in both
     # children: and choice:, or duplicate attributes.
-    excluded = existing | set(ctx.cross_block_keys)
+    excluded = existing | ctx.cross_block_keys if ctx.cross_block_keys else existing
+    # Partial name typed before the cursor; the long element and child
+    # lists are narrowed to it here rather than shipped whole to the
+    # client.  Whenever anything is left out the list is marked
+    # incomplete, so the client asks again as the user keeps typing.
+    typed = (
+        _typed_prefix(ctx.line_text, params.position.character)
+        if ctx.scope in _NAME_FILTERED_SCOPES
+        else ""
+    )
+    matches = _typed_matcher(typed)
 
-    if ctx.scope == Scope.EMPTY:
-        items.append(_key_completion("profile", "Top-level profile key", "profile:\n  "))
+    completer = _SCOPE_COMPLETERS.get(ctx.scope)
+    if completer is None:
+        return CompletionList(is_incomplete=False, items=[])
+    # Completers yield lazily: taking one past the cap is enough to know
+    # the list was cut, and the rest of the candidates are never built.
+    items = list(islice(completer(akn_schema, ctx, excluded, matches), _COMPLETION_LIMIT + 1))
+    incomplete = bool(typed) or len(items) > _COMPLETION_LIMIT
+    del items[_COMPLETION_LIMIT:]
+    return CompletionList(is_incomplete=incomplete, items=items)
+
+
+# Completion for one scope: (schema, context, keys to exclude, typed-text
+# filter) → items, produced lazily so completion can stop at the cap
+_ScopeCompleter = Callable[
+    [AknSchema, CursorContext, frozenset[str], Callable[[str], object]],
+    Iterable[CompletionItem],
+]
 
-    elif ctx.scope == Scope.ROOT:
-        if "profile" not in existing:
-            items.append(_key_completion("profile", "Top-level profile key", "profile:\n  "))
 
-    elif ctx.scope == Scope.PROFILE:
-        for key in _PROFILE_KEYS:
-            if key in existing:
-                continue
-            if key == "documentTypes":
-                items.append(
-                    _key_completion(key, "Valid AKN document types", f"{key}:\n    - $1\n")
-                )
-            elif key == "elements":
-                items.append(
-                    _key_completion(
-                        key,
-                        "Element restrictions",
-                        f"{key}:\n    $1:\n",
-                    )
-                )
-            else:
-                items.append(_key_completion(key, f"Profile {key}", f'{key}: "$1"\n'))
+def _complete_empty(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Empty document: offer the ``profile:`` root key."""
+    return (_PROFILE_ROOT_ITEM,)
+
+
+def _complete_root(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Top level: offer ``profile:`` unless it is already there."""
+    return () if "profile" in ctx.existing_keys else (_PROFILE_ROOT_ITEM,)
+
+
+def _complete_profile(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Inside ``profile:``: offer the profile keys not yet present."""
+    existing = ctx.existing_keys
+    return (item for item in _PROFILE_KEY_ITEMS if item.label not in existing)
+
+
+def _complete_document_types(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``documentTypes:``: offer the document types not yet listed."""
+    existing = ctx.existing_keys
+    doc_types = schema.document_types()
+    doc_type_infos = schema.get_element_infos(doc_types)
+    for dt in doc_types:
+        if dt in existing:
+            continue
+        info = doc_type_infos.get(dt)
+        doc_str = info.doc[:120] if info and info.doc else f"AKN document type: {dt}"
+        yield CompletionItem(
+            label=dt,
+            kind=CompletionItemKind.EnumMember,
+            detail="document type",
+            documentation=_markdown(doc_str),
+            insert_text=f"- {dt}",
+            insert_text_format=InsertTextFormat.PlainText,
+            sort_text=f"0{dt}",
+        )
 
-    elif ctx.scope == Scope.DOCUMENT_TYPES:
-        for dt in akn_schema.get_children("akomaNtoso"):
-            if dt in existing:
+
+def _complete_elements(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``elements:``: offer new element entries."""
+    existing = ctx.existing_keys
+    new_entries, _ = _element_name_items(schema)
+    return (item for item in new_entries if item.label not in existing and matches(item.label))
+
+
+def _complete_element_name(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """On an existing element name: offer all element names."""
+    # VS Code filters the rest by what's already typed
+    _, renames = _element_name_items(schema)
+    return (item for item in renames if matches(item.label))
+
+
+def _complete_element_body(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Inside an element entry: offer the element body keys not yet present."""
+    existing = ctx.existing_keys
+    return (item for item in _ELEMENT_BODY_ITEMS if item.label not in existing)
+
+
+def _complete_attributes(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``attributes:``: offer the element's attributes not yet present."""
+    existing = ctx.existing_keys
+    if ctx.element_name:
+        for attr in schema.get_attributes(ctx.element_name):
+            if attr.name in existing:
                 continue
-            info = akn_schema.get_element_info(dt)
-            doc_str = info.doc[:120] if info and info.doc else f"AKN document type: {dt}"
-            items.append(
-                CompletionItem(
-                    label=dt,
-                    kind=CompletionItemKind.EnumMember,
-                    detail="document type",
-                    documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                    insert_text=f"- {dt}",
-                    insert_text_format=InsertTextFormat.PlainText,
-                    sort_text=f"0{dt}",
-                )
+            detail = "required attribute" if attr.required else "optional attribute"
+            # Build snippet with required field pre-filled
+            req_str = "true" if attr.required else "false"
+            snippet = f"{attr.name}:\n  required: {req_str}\n"
+            if attr.enum_values:
+                snippet = f"{attr.name}:\n  required: {req_str}\n  values:\n    - $1\n"
+            yield CompletionItem(
+                label=attr.name,
+                kind=CompletionItemKind.Property,
+                detail=detail,
+                insert_text=snippet,
+                insert_text_format=InsertTextFormat.Snippet,
+                sort_text=f"{'0' if attr.required else '1'}{attr.name}",
+                data=_attribute_resolve_data(ctx.element_name, attr.name),
             )
 
-    elif ctx.scope == Scope.ELEMENTS:
-        for name in akn_schema.element_names():
-            if name in existing:
-                continue
-            info = akn_schema.get_element_info(name)
-            doc_str = _element_doc(name) if info else ""
-            snippet = f"{name}:\n"
-            items.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Class,
-                    detail="AKN element",
-                    documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                    insert_text=snippet,
-                    insert_text_format=InsertTextFormat.Snippet,
-                    sort_text=f"0{name}",
-                )
+
+def _complete_attribute_name(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """On an existing attribute name: offer all of the element's attributes."""
+    # VS Code filters by typed text
+    if ctx.element_name:
+        for attr in schema.get_attributes(ctx.element_name):
+            detail = "required attribute" if attr.required else "optional attribute"
+            yield CompletionItem(
+                label=attr.name,
+                kind=CompletionItemKind.Property,
+                detail=detail,
+                insert_text=attr.name,
+                insert_text_format=InsertTextFormat.PlainText,
+                sort_text=f"{'0' if attr.required else '1'}{attr.name}",
+                data=_attribute_resolve_data(ctx.element_name, attr.name),
             )
 
-    elif ctx.scope == Scope.ELEMENT_NAME:
-        # Cursor is on an existing element name — offer all element names
-        # (VS Code will filter by what's already typed)
-        for name in akn_schema.element_names():
-            info = akn_schema.get_element_info(name)
-            doc_str = _element_doc(name) if info else ""
-            items.append(
-                CompletionItem(
-                    label=name,
-                    kind=CompletionItemKind.Class,
-                    detail="AKN element",
-                    documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                    insert_text=name,
+
+def _complete_attribute_body(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Inside an attribute entry: offer the attribute body keys not yet present."""
+    existing = ctx.existing_keys
+    return (item for item in _ATTRIBUTE_BODY_ITEMS if item.label not in existing)
+
+
+def _complete_attribute_values(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``values:``: offer the attribute's enum values not yet listed."""
+    existing = ctx.existing_keys
+    if ctx.element_name and ctx.attribute_name:
+        elem_info = schema.get_element_info(ctx.element_name)
+        attr = elem_info.attributes_by_name.get(ctx.attribute_name) if elem_info else None
+        if attr is not None:
+            for val in attr.enum_values:
+                if val in existing:
+                    continue
+                yield CompletionItem(
+                    label=val,
+                    kind=CompletionItemKind.Value,
+                    detail="enum value",
+                    insert_text=f"- {val}",
                     insert_text_format=InsertTextFormat.PlainText,
-                    sort_text=f"0{name}",
                 )
+
+
+def _complete_children(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``children:``: offer ``choice:`` and the element's allowed children."""
+    existing = ctx.existing_keys
+    if ctx.element_name:
+        # Offer 'choice:' for any element with 2+ possible children
+        # so the user can create exclusive branches in their profile.
+        all_children = schema.get_children(ctx.element_name)
+        if len(all_children) >= 2 and "choice" not in existing:
+            examples = sorted(c for c in all_children if c not in excluded)[:6]
+            examples_str = ", ".join(examples)
+            ellipsis = ", …" if len(all_children) > 6 else ""
+            yield CompletionItem(
+                label="choice",
+                kind=CompletionItemKind.Property,
+                detail="restrict to exclusive branches",
+                documentation=MarkupContent(
+                    kind=MarkupKind.Markdown,
+                    value=(
+                        "**choice** — Declare mutually exclusive "
+                        "child groups.\n\n"
+                        "Group children into branches. Only ONE "
+                        "branch applies per element instance, "
+                        "restricting the schema to your use case.\n\n"
+                        f"Available children: {examples_str}{ellipsis}"
+                    ),
+                ),
+                insert_text="choice:",
+                insert_text_format=InsertTextFormat.PlainText,
+                sort_text="0__choice",
+                command=Command(
+                    title="Suggest branches",
+                    command="akn-profiler.insertNewLineAndSuggest",
+                ),
             )
 
-    elif ctx.scope == Scope.ELEMENT_BODY:
-        for key in _ELEMENT_BODY_KEYS:
-            if key in existing:
+        # Everything on a child item comes from the schema, so the items
+        # are built once per parent and only filtered here
+        yield from (
+            item
+            for item in _child_items(schema, ctx.element_name)
+            if item.label not in excluded and matches(item.label)
+        )
+
+
+def _complete_structure(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``structure:``: offer the element's children as hierarchy levels."""
+    existing = ctx.existing_keys
+    if ctx.element_name:
+        for child_name in schema.get_children(ctx.element_name):
+            if child_name in existing:
                 continue
-            snippet = _element_body_snippet(key, ctx.element_name)
-            items.append(_key_completion(key, f"Element {key}", snippet))
+            yield CompletionItem(
+                label=child_name,
+                kind=CompletionItemKind.Class,
+                detail="hierarchy level",
+                insert_text=f"- {child_name}",
+                insert_text_format=InsertTextFormat.PlainText,
+            )
 
-    elif ctx.scope == Scope.ATTRIBUTES:
-        if ctx.element_name:
-            for attr in akn_schema.get_attributes(ctx.element_name):
-                if attr.name in existing:
-                    continue
-                detail = "required attribute" if attr.required else "optional attribute"
-                doc_str = _attribute_doc(attr)
-                # Build snippet with required field pre-filled
-                req_str = "true" if attr.required else "false"
-                snippet = f"{attr.name}:\n  required: {req_str}\n"
-                if attr.enum_values:
-                    snippet = f"{attr.name}:\n  required: {req_str}\n  values:\n    - $1\n"
-                items.append(
-                    CompletionItem(
-                        label=attr.name,
-                        kind=CompletionItemKind.Property,
-                        detail=detail,
-                        documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                        insert_text=snippet,
-                        insert_text_format=InsertTextFormat.Snippet,
-                        sort_text=f"{'0' if attr.required else '1'}{attr.name}",
-                    )
-                )
 
-    elif ctx.scope == Scope.ATTRIBUTE_NAME:
-        # Cursor is on an existing attribute name — offer all attributes
-        # for the parent element (VS Code filters by typed text)
-        if ctx.element_name:
-            for attr in akn_schema.get_attributes(ctx.element_name):
-                detail = "required attribute" if attr.required else "optional attribute"
-                doc_str = _attribute_doc(attr)
-                items.append(
-                    CompletionItem(
-                        label=attr.name,
-                        kind=CompletionItemKind.Property,
-                        detail=detail,
-                        documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                        insert_text=attr.name,
-                        insert_text_format=InsertTextFormat.PlainText,
-                        sort_text=f"{'0' if attr.required else '1'}{attr.name}",
-                    )
-                )
+_NEXT_CHOICE_COMMAND = Command(
+    title="Add next choice element",
+    command="akn-profiler.insertNewLineAndSuggest",
+)
 
-    elif ctx.scope == Scope.ATTRIBUTE_BODY:
-        for key in _ATTRIBUTE_BODY_KEYS:
-            if key in existing:
+
+def _complete_choice_branches(
+    schema: AknSchema,
+    ctx: CursorContext,
+    excluded: frozenset[str],
+    matches: Callable[[str], object],
+) -> Iterable[CompletionItem]:
+    """Under ``choice:``: offer the element's children as exclusive options."""
+    existing = ctx.existing_keys
+    if ctx.element_name:
+        # Each entry is a dict key: "elementName: \"card\""
+        all_children = schema.get_children(ctx.element_name)
+        parent_info = schema.get_element_info(ctx.element_name)
+        # Chain auto-suggest until the first valid choice element is in
+        # place; only whether one exists matters, not how many.
+        child_infos = parent_info.children_by_name if parent_info else {}
+        chain_next = existing.isdisjoint(child_infos)
+        child_elements = schema.get_element_infos(all_children)
+        for child_name in all_children:
+            if child_name in excluded or not matches(child_name):
                 continue
-            if key == "required":
-                items.append(
-                    _key_completion(
-                        key,
-                        "Whether this attribute is required",
-                        "required: ${1|true,false|}\n",
-                    )
-                )
-            elif key == "values":
-                items.append(_key_completion(key, "Allowed enum values", "values:\n  - $1\n"))
-
-    elif ctx.scope == Scope.ATTRIBUTE_VALUES:
-        if ctx.element_name and ctx.attribute_name:
-            for attr in akn_schema.get_attributes(ctx.element_name):
-                if attr.name == ctx.attribute_name:
-                    for val in attr.enum_values:
-                        if val in existing:
-                            continue
-                        items.append(
-                            CompletionItem(
-                                label=val,
-                                kind=CompletionItemKind.Value,
-                                detail="enum value",
-                                insert_text=f"- {val}",
-                                insert_text_format=InsertTextFormat.PlainText,
-                            )
-                        )
-                    break
+            info = child_elements.get(child_name)
+            doc_str = info.doc[:120] if info and info.doc else ""
+            # Look up XSD cardinality for this child
+            child_info = child_infos.get(child_name)
+            card = child_info.cardinality if child_info else ""
+            branch_text = f"{child_name}: {card}" if card else f"{child_name}:"
+            # Chain auto-suggest: prompt for the next one after this pick
+            chain_cmd = _NEXT_CHOICE_COMMAND if chain_next else None
+            yield CompletionItem(
+                label=child_name,
+                kind=CompletionItemKind.Class,
+                detail=f"exclusive option ({card})" if card else "exclusive option",
+                documentation=_markdown(doc_str) if doc_str else None,
+                insert_text=branch_text,
+                insert_text_format=InsertTextFormat.PlainText,
+                command=chain_cmd,
+            )
 
-    elif ctx.scope == Scope.CHILDREN:
-        if ctx.element_name:
-            # Offer 'choice:' for any element with 2+ possible children
-            # so the user can create exclusive branches in their profile.
-            all_children = akn_schema.get_children(ctx.element_name)
-            if len(all_children) >= 2 and "choice" not in existing:
-                examples = sorted(c for c in all_children if c not in excluded)[:6]
-                examples_str = ", ".join(examples)
-                ellipsis = ", …" if len(all_children) > 6 else ""
-                items.append(
-                    CompletionItem(
-                        label="choice",
-                        kind=CompletionItemKind.Property,
-                        detail="restrict to exclusive branches",
-                        documentation=MarkupContent(
-                            kind=MarkupKind.Markdown,
-                            value=(
-                                "**choice** — Declare mutually exclusive "
-                                "child groups.\n\n"
-                                "Group children into branches. Only ONE "
-                                "branch applies per element instance, "
-                                "restricting the schema to your use case.\n\n"
-                                f"Available children: {examples_str}{ellipsis}"
-                            ),
-                        ),
-                        insert_text="choice:",
-                        insert_text_format=InsertTextFormat.PlainText,
-                        sort_text="0__choice",
-                        command=Command(
-                            title="Suggest branches",
-                            command="akn-profiler.insertNewLineAndSuggest",
-                        ),
-                    )
-                )
 
-            # Build a child_name → choice group label map for richer details
-            child_group_labels: dict[str, str] = {}
-            choice_groups = akn_schema.get_choice_groups(ctx.element_name)
-            for cg in choice_groups:
-                for branch in cg.branches:
-                    label = branch.label or branch.branch_id
-                    for member in branch.elements:
-                        child_group_labels.setdefault(member, label)
-
-            for child_name in akn_schema.get_children(ctx.element_name):
-                if child_name in excluded:
-                    continue
-                req_children = {c.name for c in akn_schema.get_required_children(ctx.element_name)}
-                is_req = child_name in req_children
-                detail = "required child" if is_req else "optional child"
-                group_label = child_group_labels.get(child_name)
-                if group_label:
-                    detail = f"{detail} [{group_label}]"
-                info = akn_schema.get_element_info(child_name)
-                doc_str = info.doc[:120] if info and info.doc else ""
-                # Find cardinality from parent's ChildInfo
-                card = ""
-                parent_info = akn_schema.get_element_info(ctx.element_name)
-                if parent_info:
-                    for c in parent_info.children:
-                        if c.name == child_name:
-                            card = c.cardinality
-                            break
-                snippet = f"{child_name}: {card}" if card else f"{child_name}:"
-                # Sort by required first, then by group, then alphabetical
-                group_sort = group_label or "zzz"
-                items.append(
-                    CompletionItem(
-                        label=child_name,
-                        kind=CompletionItemKind.Class,
-                        detail=f"{detail} ({card})" if card else detail,
-                        documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str),
-                        insert_text=snippet,
-                        insert_text_format=InsertTextFormat.PlainText,
-                        sort_text=f"{'0' if is_req else '1'}_{group_sort}_{child_name}",
-                    )
-                )
+_SCOPE_COMPLETERS: dict[Scope, _ScopeCompleter] = {
+    Scope.EMPTY: _complete_empty,
+    Scope.ROOT: _complete_root,
+    Scope.PROFILE: _complete_profile,
+    Scope.DOCUMENT_TYPES: _complete_document_types,
+    Scope.ELEMENTS: _complete_elements,
+    Scope.ELEMENT_NAME: _complete_element_name,
+    Scope.ELEMENT_BODY: _complete_element_body,
+    Scope.ATTRIBUTES: _complete_attributes,
+    Scope.ATTRIBUTE_NAME: _complete_attribute_name,
+    Scope.ATTRIBUTE_BODY: _complete_attribute_body,
+    Scope.ATTRIBUTE_VALUES: _complete_attribute_values,
+    Scope.CHILDREN: _complete_children,
+    Scope.STRUCTURE: _complete_structure,
+    Scope.CHOICE_BRANCHES: _complete_choice_branches,
+}
 
-    elif ctx.scope == Scope.STRUCTURE:
-        if ctx.element_name:
-            for child_name in akn_schema.get_children(ctx.element_name):
-                if child_name in existing:
-                    continue
-                items.append(
-                    CompletionItem(
-                        label=child_name,
-                        kind=CompletionItemKind.Class,
-                        detail="hierarchy level",
-                        insert_text=f"- {child_name}",
-                        insert_text_format=InsertTextFormat.PlainText,
-                    )
-                )
 
-    elif ctx.scope == Scope.CHOICE_BRANCHES:
-        if ctx.element_name:
-            # Inside choice: — offer child elements as exclusive options.
-            # Each entry is a dict key: "elementName: \"card\""
-            all_children = akn_schema.get_children(ctx.element_name)
-            parent_info = akn_schema.get_element_info(ctx.element_name)
-            # Count how many valid choice elements already exist so we
-            # can chain auto-suggest for the first two picks.
-            existing_choice_count = len([k for k in existing if k in set(all_children)])
-            for child_name in all_children:
-                if child_name in excluded:
-                    continue
-                info = akn_schema.get_element_info(child_name)
-                doc_str = info.doc[:120] if info and info.doc else ""
-                # Look up XSD cardinality for this child
-                card = ""
-                if parent_info:
-                    for c in parent_info.children:
-                        if c.name == child_name:
-                            card = c.cardinality
-                            break
-                if card:
-                    branch_text = f"{child_name}: {card}"
-                else:
-                    branch_text = f"{child_name}:"
-                # Chain auto-suggest: if fewer than 2 choice elements
-                # exist, attach a command to prompt for the next one.
-                chain_cmd = None
-                if existing_choice_count < 1:
-                    chain_cmd = Command(
-                        title="Add next choice element",
-                        command="akn-profiler.insertNewLineAndSuggest",
-                    )
-                items.append(
-                    CompletionItem(
-                        label=child_name,
-                        kind=CompletionItemKind.Class,
-                        detail=f"exclusive option ({card})" if card else "exclusive option",
-                        documentation=MarkupContent(kind=MarkupKind.Markdown, value=doc_str)
-                        if doc_str
-                        else None,
-                        insert_text=branch_text,
-                        insert_text_format=InsertTextFormat.PlainText,
-                        command=chain_cmd,
-                    )
-                )
+# Most items a single completion response carries
+_COMPLETION_LIMIT = 200
+# Scopes whose (long) name lists are filtered by the typed prefix
+_NAME_FILTERED_SCOPES = frozenset(
+    {Scope.ELEMENTS, Scope.ELEMENT_NAME, Scope.CHILDREN, Scope.CHOICE_BRANCHES}
+)
 
-    return CompletionList(is_incomplete=False, items=items)
+
+# "name: …", "profileNote: …" etc. with a value already begun
+_FREE_TEXT_VALUE_RE = _re.compile(r"^\s*(?:name|version|description|profileNote)\s*:\s*\S")
+# A "#" comment opened before any quote on the line
+_COMMENT_RE = _re.compile(r"^(?:[^\"'#]*\s)?#")
+# A quoted scalar value opened after a colon and not yet closed
+_OPEN_QUOTE_RE = _re.compile(r":\s*([\"'])(?:(?!\1).)*$")
+
+
+def _in_free_text(source: str, line: int, character: int) -> bool:
+    """Is the cursor inside a free-text value, a comment or a quoted scalar?"""
+    spans = _line_spans(source)
+    if line >= len(spans):
+        return False
+    line_start, line_end = spans[line]
+    before = source[line_start : min(line_start + character, line_end)]
+    return bool(
+        _FREE_TEXT_VALUE_RE.match(before)
+        or _COMMENT_RE.match(before)
+        or _OPEN_QUOTE_RE.search(before)
+    )
+
+
+def _typed_prefix(line_text: str, character: int) -> str:
+    """Return the partial word immediately before the cursor."""
+    end = min(character, len(line_text))
+    start = end
+    while start > 0 and (line_text[start - 1].isalnum() or line_text[start - 1] in ("_", "-")):
+        start -= 1
+    return line_text[start:end]
+
+
+@functools.lru_cache(maxsize=64)
+def _typed_matcher(typed: str) -> Callable[[str], object]:
+    """Return a predicate: could the client's filter keep a label for *typed*?
+
+    A label matches when *typed* is a case-insensitive subsequence of it
+    — a superset of what fuzzy-matching clients show, so pre-filtering on
+    the server never hides an item the client would have offered.  The
+    subsequence test is compiled into one regex (``s.*?e.*?c``) so the
+    scan over several hundred element names runs in C; successive
+    keystrokes re-request the same few prefixes, hence the cache.
+    """
+    pattern = ".*?".join(map(_re.escape, typed))
+    return _re.compile(pattern, _re.IGNORECASE | _re.DOTALL).search
+
+
+@server.feature(COMPLETION_ITEM_RESOLVE)
+def completion_item_resolve(item: CompletionItem) -> CompletionItem:
+    """Fill in the documentation of the completion item the user selected.
+
+    Element and attribute items are sent without their Markdown docs;
+    the client asks for them here, one item at a time, when it shows
+    the details panel.
+    """
+    data = item.data
+    if akn_schema is None or not isinstance(data, dict) or item.documentation is not None:
+        return item
+
+    doc_str = ""
+    if data.get("kind") == "element":
+        doc_str = _element_doc_for(akn_schema, str(data.get("name")))
+    elif data.get("kind") == "attribute":
+        elem_info = akn_schema.get_element_info(str(data.get("element")))
+        attr = elem_info.attributes_by_name.get(str(data.get("name"))) if elem_info else None
+        if attr is not None:
+            doc_str = _attribute_doc(attr)
+
+    if doc_str:
+        item.documentation = _markdown(doc_str)
+    return item
+
+
+@functools.lru_cache(maxsize=32)
+def _context_at(source: str, line: int, character: int) -> CursorContext:
+    """Memoised ``resolve_context`` for completion and hover.
+
+    Editors re-request completion at the same position (trigger
+    characters, manual invocation, hover over the same key) on unchanged
+    text; keyed on the full text, a stale context is never returned.
+    The result is shared, so callers must not mutate it.
+    """
+    return resolve_context(source, line, character)
 
 
 def _key_completion(label: str, detail: str, snippet: str) -> CompletionItem:
@@ -605,24 +809,148 @@ def _key_completion(label: str, detail: str, snippet: str) -> CompletionItem:
     )
 
 
-def _element_body_snippet(key: str, element_name: str | None) -> str:
-    """Return snippet text for a key inside an element body."""
-    if key == "profileNote":
-        return 'profileNote: "$1"\n'
-    if key == "attributes":
-        return "attributes:\n  $1:\n"
-    if key == "children":
-        return "children:\n  $1:\n"
-    if key == "structure":
-        return "structure:\n  - $1\n"
-    return f"{key}: $1\n"
+@functools.lru_cache(maxsize=2048)
+def _markdown(value: str) -> MarkupContent:
+    """Markdown documentation for a completion item, shared between items.
+
+    Many items carry the same (often empty) text; each distinct text gets
+    one ``MarkupContent``, which is never modified after construction.
+    """
+    return MarkupContent(kind=MarkupKind.Markdown, value=value)
+
+
+@functools.lru_cache(maxsize=4)
+def _element_name_items(
+    schema: AknSchema,
+) -> tuple[tuple[CompletionItem, ...], tuple[CompletionItem, ...]]:
+    """Completion items for every schema element, built once per schema.
+
+    Returns ``(new_entries, renames)``: the first insert a new
+    ``name:`` entry under ``elements:``, the second replace the element
+    name under the cursor.  Documentation is filled in on
+    ``completionItem/resolve``; requests only filter these items, never
+    modify them.
+    """
+    new_entries: list[CompletionItem] = []
+    renames: list[CompletionItem] = []
+    for name in schema.element_names():
+        data = {"kind": "element", "name": name}
+        new_entries.append(
+            CompletionItem(
+                label=name,
+                kind=CompletionItemKind.Class,
+                detail="AKN element",
+                insert_text=f"{name}:\n",
+                insert_text_format=InsertTextFormat.Snippet,
+                sort_text=f"0{name}",
+                data=data,
+            )
+        )
+        renames.append(
+            CompletionItem(
+                label=name,
+                kind=CompletionItemKind.Class,
+                detail="AKN element",
+                insert_text=name,
+                insert_text_format=InsertTextFormat.PlainText,
+                sort_text=f"0{name}",
+                data=data,
+            )
+        )
+    return tuple(new_entries), tuple(renames)
+
+
+@functools.lru_cache(maxsize=256)
+def _child_items(schema: AknSchema, element_name: str) -> tuple[CompletionItem, ...]:
+    """Completion items for the children of *element_name* under ``children:``.
+
+    Labels, details, cardinality snippets and sort keys depend only on
+    the schema, so each parent's items are built on first use and then
+    shared by every request.
+    """
+    parent_info = schema.get_element_info(element_name)
+    if parent_info is None:
+        return ()
+    # Required-ness, choice-group labels and cardinalities are
+    # precomputed on the parent's ElementInfo
+    req_children = parent_info.required_child_names
+    child_group_labels = parent_info.choice_group_labels
+    child_elements = schema.get_element_infos(parent_info.child_names)
+
+    items: list[CompletionItem] = []
+    for child_info in parent_info.children:
+        child_name = child_info.name
+        is_req = child_name in req_children
+        detail = "required child" if is_req else "optional child"
+        group_label = child_group_labels.get(child_name)
+        if group_label:
+            detail = f"{detail} [{group_label}]"
+        info = child_elements.get(child_name)
+        doc_str = info.doc[:120] if info and info.doc else ""
+        card = child_info.cardinality
+        snippet = f"{child_name}: {card}" if card else f"{child_name}:"
+        # Sort by required first, then by group, then alphabetical
+        group_sort = group_label or "zzz"
+        items.append(
+            CompletionItem(
+                label=child_name,
+                kind=CompletionItemKind.Class,
+                detail=f"{detail} ({card})" if card else detail,
+                documentation=_markdown(doc_str),
+                insert_text=snippet,
+                insert_text_format=InsertTextFormat.PlainText,
+                sort_text=f"{'0' if is_req else '1'}_{group_sort}_{child_name}",
+            )
+        )
+    return tuple(items)
+
+
+def _attribute_resolve_data(element_name: str, attr_name: str) -> dict[str, str]:
+    """``data`` payload that lets resolve find an attribute's docs."""
+    return {"kind": "attribute", "element": element_name, "name": attr_name}
+
+
+def _profile_key_completion(key: str) -> CompletionItem:
+    """Key-completion item for a key directly under ``profile:``."""
+    if key == "documentTypes":
+        return _key_completion(key, "Valid AKN document types", f"{key}:\n    - $1\n")
+    if key == "elements":
+        return _key_completion(key, "Element restrictions", f"{key}:\n    $1:\n")
+    return _key_completion(key, f"Profile {key}", f'{key}: "$1"\n')
+
+
+# The structural-key completions never change, so they are built once
+# here; each request only filters out the keys already present.
+_PROFILE_ROOT_ITEM = _key_completion("profile", "Top-level profile key", "profile:\n  ")
+_PROFILE_KEY_ITEMS = tuple(_profile_key_completion(key) for key in _PROFILE_KEYS)
+_ELEMENT_BODY_ITEMS = tuple(
+    _key_completion(key, f"Element {key}", snippet)
+    for key, snippet in _ELEMENT_BODY_SNIPPETS.items()
+)
+_ATTRIBUTE_BODY_ITEMS = (
+    _key_completion(
+        "required", "Whether this attribute is required", "required: ${1|true,false|}\n"
+    ),
+    _key_completion("values", "Allowed enum values", "values:\n  - $1\n"),
+)
 
 
 def _element_doc(name: str) -> str:
     """Build a Markdown documentation string for an AKN element."""
     if akn_schema is None:
         return ""
-    info = akn_schema.get_element_info(name)
+    return _element_doc_for(akn_schema, name)
+
+
+@functools.lru_cache(maxsize=1024)
+def _element_doc_for(schema: AknSchema, name: str) -> str:
+    """Memoised body of :func:`_element_doc`.
+
+    The schema is immutable once loaded and element-name completion asks
+    for every element's doc on each request, so each string is built
+    once per schema (which is part of the key, by identity).
+    """
+    info = schema.get_element_info(name)
     if info is None:
         return ""
     parts = []
@@ -674,8 +1002,12 @@ def _element_doc(name: str) -> str:
     return "\n\n".join(parts) if parts else name
 
 
-def _attribute_doc(attr: Any) -> str:
-    """Build a Markdown documentation string for an element attribute."""
+@functools.lru_cache(maxsize=1024)
+def _attribute_doc(attr: AttrInfo) -> str:
+    """Build a Markdown documentation string for an element attribute.
+
+    Memoised: ``AttrInfo`` is frozen, so equal attributes share one string.
+    """
     parts = []
     if getattr(attr, "doc", ""):
         parts.append(attr.doc)
@@ -723,6 +1055,75 @@ def code_lens(params: CodeLensParams) -> list[CodeLens]:
 # textDocument/hover
 # ==================================================================
 
+# Documentation for the profile's structural keys
+_PROFILE_KEY_DOCS = {
+    "profile": (
+        "**profile** — Root key for an Akoma Ntoso application profile.\n\n"
+        "Defines which elements, attributes, document types, and metadata "
+        "sections are allowed in conforming AKN documents."
+    ),
+    "name": "**name** — Human-readable name for this profile (e.g. 'Minimum Act Profile').",
+    "version": "**version** — Version string for this profile (e.g. '1.0').",
+    "description": ("**description** — Free-text description of this profile's purpose and scope."),
+    "documentTypes": (
+        "**documentTypes** — List of allowed AKN document types.\n\n"
+        "Each entry must be a valid child of `<akomaNtoso>` (e.g. `act`, `bill`, `debate`)."
+    ),
+    "elements": (
+        "**elements** — Element restrictions.\n\n"
+        "Each key is an XSD element name. Presence means the element is allowed "
+        "in this profile. Nested keys define attribute restrictions, allowed "
+        "children with cardinality, and structural hierarchy."
+    ),
+    "children": (
+        "**children** — Allowed child elements with optional cardinality overrides.\n\n"
+        "Keys are child element names, values are cardinality strings "
+        '(e.g. `"1..1"`, `"0..*"`) or empty for XSD defaults.\n\n'
+        "Cardinality must be at least as strict as the XSD — "
+        "loosening the schema is not allowed.\n\n"
+        "Use `choice:` to declare mutually exclusive child branches "
+        "(e.g. section OR subchapter, but not both)."
+    ),
+    "choice": (
+        "**choice** — Mutually exclusive children.\n\n"
+        "Each key is an exclusive child element — only ONE of the listed "
+        "children may appear per element instance.\n\n"
+        "Example:\n"
+        "```yaml\n"
+        "choice:\n"
+        '  section: "1..*"\n'
+        '  subchapter: "1..*"\n'
+        "```"
+    ),
+    "attributes": (
+        "**attributes** — Attribute restrictions.\n\n"
+        "Each key is an XSD attribute name. Use `required: true/false` to "
+        "indicate whether the attribute must be present, and optionally "
+        "restrict `values:` to a subset of the XSD enum."
+    ),
+    "structure": (
+        "**structure** — Ordered hierarchy of structural elements.\n\n"
+        "Defines the nesting order (e.g. `chapter → article → paragraph`). "
+        "Each consecutive pair must form a valid parent→child in the XSD."
+    ),
+    "values": (
+        "**values** — Restricts allowed enum values.\n\n"
+        "Must be a subset of the XSD-defined values for this attribute."
+    ),
+    "required": (
+        "**required** — Whether this attribute must be present.\n\n"
+        "Must be at least as strict as the XSD — setting `false` on an "
+        "XSD-required attribute will emit an error."
+    ),
+    "profileNote": (
+        "**profileNote** — Curator annotation for this element.\n\n"
+        "Explanatory text for readers of the profile and documentation "
+        "generators. Use it to record design rationale, mappings to local "
+        "terminology, or original-language terms.\n\n"
+        "Does **not** affect validation."
+    ),
+}
+
 
 @server.feature(TEXT_DOCUMENT_HOVER)
 @_safe_handler(None)
@@ -732,81 +1133,10 @@ def hover(params: HoverParams) -> Hover | None:
         return None
 
     doc = server.workspace.get_text_document(params.text_document.uri)
-    ctx = resolve_context(doc.source, params.position.line, params.position.character)
+    ctx = _context_at(doc.source, params.position.line, params.position.character)
 
     content: str | None = None
 
-    # --- Profile-level key documentation ---
-    _PROFILE_KEY_DOCS = {
-        "profile": (
-            "**profile** — Root key for an Akoma Ntoso application profile.\n\n"
-            "Defines which elements, attributes, document types, and metadata "
-            "sections are allowed in conforming AKN documents."
-        ),
-        "name": "**name** — Human-readable name for this profile (e.g. 'Minimum Act Profile').",
-        "version": "**version** — Version string for this profile (e.g. '1.0').",
-        "description": (
-            "**description** — Free-text description of this profile's purpose and scope."
-        ),
-        "documentTypes": (
-            "**documentTypes** — List of allowed AKN document types.\n\n"
-            "Each entry must be a valid child of `<akomaNtoso>` (e.g. `act`, `bill`, `debate`)."
-        ),
-        "elements": (
-            "**elements** — Element restrictions.\n\n"
-            "Each key is an XSD element name. Presence means the element is allowed "
-            "in this profile. Nested keys define attribute restrictions, allowed "
-            "children with cardinality, and structural hierarchy."
-        ),
-        "children": (
-            "**children** — Allowed child elements with optional cardinality overrides.\n\n"
-            "Keys are child element names, values are cardinality strings "
-            '(e.g. `"1..1"`, `"0..*"`) or empty for XSD defaults.\n\n'
-            "Cardinality must be at least as strict as the XSD — "
-            "loosening the schema is not allowed.\n\n"
-            "Use `choice:` to declare mutually exclusive child branches "
-            "(e.g. section OR subchapter, but not both)."
-        ),
-        "choice": (
-            "**choice** — Mutually exclusive children.\n\n"
-            "Each key is an exclusive child element — only ONE of the listed "
-            "children may appear per element instance.\n\n"
-            "Example:\n"
-            "```yaml\n"
-            "choice:\n"
-            '  section: "1..*"\n'
-            '  subchapter: "1..*"\n'
-            "```"
-        ),
-        "attributes": (
-            "**attributes** — Attribute restrictions.\n\n"
-            "Each key is an XSD attribute name. Use `required: true/false` to "
-            "indicate whether the attribute must be present, and optionally "
-            "restrict `values:` to a subset of the XSD enum."
-        ),
-        "structure": (
-            "**structure** — Ordered hierarchy of structural elements.\n\n"
-            "Defines the nesting order (e.g. `chapter → article → paragraph`). "
-            "Each consecutive pair must form a valid parent→child in the XSD."
-        ),
-        "values": (
-            "**values** — Restricts allowed enum values.\n\n"
-            "Must be a subset of the XSD-defined values for this attribute."
-        ),
-        "required": (
-            "**required** — Whether this attribute must be present.\n\n"
-            "Must be at least as strict as the XSD — setting `false` on an "
-            "XSD-required attribute will emit an error."
-        ),
-        "profileNote": (
-            "**profileNote** — Curator annotation for this element.\n\n"
-            "Explanatory text for readers of the profile and documentation "
-            "generators. Use it to record design rationale, mappings to local "
-            "terminology, or original-language terms.\n\n"
-            "Does **not** affect validation."
-        ),
-    }
-
     if ctx.scope == Scope.PROFILE:
         word = _word_at(doc.source, params.position.line, params.position.character)
         if word in _PROFILE_KEY_DOCS:
@@ -895,31 +1225,79 @@ def hover(params: HoverParams) -> Hover | None:
     return None
 
 
+# Line boundaries exactly as ``str.splitlines`` recognises them
+_LINE_BREAK_RE = _re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+@functools.lru_cache(maxsize=8)
+def _source_lines(source: str) -> tuple[str, ...]:
+    """Return ``source.splitlines()``, computed once per document text.
+
+    A single code-action request runs several helpers over the same
+    text, one call per diagnostic; they share this tuple instead of each
+    splitting the document again.
+    """
+    return tuple(source.splitlines())
+
+
+@functools.lru_cache(maxsize=8)
+def _line_spans(source: str) -> tuple[tuple[int, int], ...]:
+    """Return ``(start, end)`` offsets of each line of *source*.
+
+    Lines are numbered as ``source.splitlines()`` would number them.
+    Hover looks up the word under the cursor several times per request,
+    so the offsets are indexed once per document text instead of
+    splitting the whole document on each lookup.
+    """
+    spans: list[tuple[int, int]] = []
+    start = 0
+    for m in _LINE_BREAK_RE.finditer(source):
+        spans.append((start, m.start()))
+        start = m.end()
+    if start < len(source):
+        spans.append((start, len(source)))
+    return tuple(spans)
+
+
+# A run of word characters: str.isalnum() characters, "_" and "-"
+_WORD_RE = _re.compile(r"[\w-]+")
+
+
 def _word_at(source: str, line: int, character: int) -> str | None:
     """Extract the word under the cursor."""
-    lines = source.splitlines()
-    if line >= len(lines):
+    spans = _line_spans(source)
+    if line >= len(spans):
         return None
-    text = lines[line]
-    if character >= len(text):
+    line_start, line_end = spans[line]
+    pos = line_start + character
+    if pos >= line_end:
         return None
 
-    # Find word boundaries
-    start = character
-    while start > 0 and (text[start - 1].isalnum() or text[start - 1] in ("_", "-")):
-        start -= 1
-    end = character
-    while end < len(text) and (text[end].isalnum() or text[end] in ("_", "-")):
-        end += 1
-
-    word = text[start:end]
-    return word if word else None
+    # The first word reaching the cursor, matched in place on the line;
+    # a cursor just past a word's last character still selects it
+    for m in _WORD_RE.finditer(source, line_start, line_end):
+        if m.end() >= pos:
+            return m.group() if m.start() <= pos else None
+    return None
 
 
 # ==================================================================
 # textDocument/codeAction
 # ==================================================================
 
+# "'name' is not …"; group 1 is the first quoted name
+_QUOTED_NAME_MSG_RE = _re.compile(r"'([^']+)'")
+# "<elemName> is on the required-child chain …"
+_REQUIRED_ELEMENT_MSG_RE = _re.compile(r"<(\w[\w-]*)>")
+# "'attr' is not a valid attribute on <elemName>. …"
+_ATTRIBUTE_OWNER_MSG_RE = _re.compile(r" on <(\w[\w-]*)>")
+# "… Conflicting: a, b"
+_CONFLICT_MSG_RE = _re.compile(r"Conflicting: (.+)$")
+# Indented "key:" lines; group 1 is the indent, group 2 the key
+_INDENTED_KEY_RE = _re.compile(r"^(\s+)([\w][\w-]*)\s*:")
+# "key:" at any indent; group 1 is the key
+_KEY_NAME_RE = _re.compile(r"^\s*([\w][\w-]*)\s*:")
+
 
 @server.feature(TEXT_DOCUMENT_CODE_ACTION)
 @_safe_handler([])
@@ -928,9 +1306,38 @@ def code_action(params: CodeActionParams) -> list[CodeAction]:
     if akn_schema is None:
         return []
 
-    actions: list[CodeAction] = []
     uri = params.text_document.uri
     doc = server.workspace.get_text_document(uri)
+    start = params.range.start
+    # The identity auto-add settings shape the "Define …" cascade edits
+    key: tuple[object, ...] = (
+        doc.version,
+        doc.source,
+        start.line,
+        start.character,
+        _auto_add_eid,
+        _auto_add_wid,
+        _auto_add_guid,
+        _auto_id_required,
+        tuple(
+            (d.source, d.code, d.range.start.line, d.range.start.character, d.message)
+            for d in params.context.diagnostics
+        ),
+    )
+    cached = _last_code_actions.get(uri)
+    if cached is not None and cached[0] == key:
+        return list(cached[1])
+
+    actions = _build_code_actions(params, doc)
+    _last_code_actions[uri] = (key, actions)
+    return list(actions)
+
+
+def _build_code_actions(params: CodeActionParams, doc: TextDocument) -> list[CodeAction]:
+    """Build the code actions for *params* against the current *doc*."""
+    assert akn_schema is not None
+    actions: list[CodeAction] = []
+    uri = params.text_document.uri
 
     # ------------------------------------------------------------------
     # Phase 1: diagnostic-based quick-fixes
@@ -938,243 +1345,277 @@ def code_action(params: CodeActionParams) -> list[CodeAction]:
     for diagnostic in params.context.diagnostics:
         if diagnostic.source != "akn-profiler":
             continue
-        msg = diagnostic.message
-        line = diagnostic.range.start.line
-
         # Get rule_id from diagnostic code field
         rule_id = str(diagnostic.code) if diagnostic.code else ""
+        quick_fix = _QUICK_FIXES.get(rule_id)
+        if quick_fix is not None:
+            actions.extend(quick_fix(uri, doc.source, diagnostic))
 
-        if rule_id == "vocab.unknown-element":
-            # Suggest closest element name
-            unknown = _extract_name_from_msg(msg)
-            if unknown:
-                suggestions = difflib.get_close_matches(
-                    unknown, akn_schema.element_names(), n=3, cutoff=0.5
-                )
-                for suggestion in suggestions:
-                    edit = _replace_word_edit(uri, doc.source, line, unknown, suggestion)
-                    if edit:
-                        actions.append(
-                            CodeAction(
-                                title=f"Replace with '{suggestion}'",
-                                kind=CodeActionKind.QuickFix,
-                                diagnostics=[diagnostic],
-                                edit=edit,
-                            )
-                        )
+    # ------------------------------------------------------------------
+    # Phase 2: contextual "Add …" lightbulb actions
+    # ------------------------------------------------------------------
+    actions.extend(_add_item_actions(uri, doc.source, params.range.start.line))
 
-        elif rule_id == "vocab.unknown-attribute":
-            unknown = _extract_name_from_msg(msg)
-            elem_name = _find_element_context(doc.source, line)
-            if unknown and elem_name:
-                attr_names = [a.name for a in akn_schema.get_attributes(elem_name)]
-                suggestions = difflib.get_close_matches(unknown, attr_names, n=3, cutoff=0.5)
-                for suggestion in suggestions:
-                    edit = _replace_word_edit(uri, doc.source, line, unknown, suggestion)
-                    if edit:
-                        actions.append(
-                            CodeAction(
-                                title=f"Replace with '{suggestion}'",
-                                kind=CodeActionKind.QuickFix,
-                                diagnostics=[diagnostic],
-                                edit=edit,
-                            )
-                        )
+    return actions
 
-        elif rule_id == "vocab.unknown-doctype":
-            unknown = _extract_name_from_msg(msg)
-            if unknown:
-                valid = akn_schema.get_children("akomaNtoso")
-                suggestions = difflib.get_close_matches(unknown, valid, n=3, cutoff=0.4)
-                for suggestion in suggestions:
-                    edit = _replace_word_edit(uri, doc.source, line, unknown, suggestion)
-                    if edit:
-                        actions.append(
-                            CodeAction(
-                                title=f"Replace with '{suggestion}'",
-                                kind=CodeActionKind.QuickFix,
-                                diagnostics=[diagnostic],
-                                edit=edit,
-                            )
-                        )
 
-        elif rule_id == "parse.not-a-mapping":
-            # Empty file or non-mapping content
-            actions.append(
-                CodeAction(
-                    title="Insert profile scaffold",
-                    kind=CodeActionKind.QuickFix,
-                    diagnostics=[diagnostic],
-                    edit=WorkspaceEdit(
-                        changes={
-                            uri: [
-                                TextEdit(
-                                    range=Range(
-                                        start=Position(line=0, character=0),
-                                        end=Position(line=0, character=0),
-                                    ),
-                                    new_text=(
-                                        "profile:\n"
-                                        '  name: ""\n'
-                                        '  version: ""\n'
-                                        '  description: ""\n'
-                                        "\n"
-                                        "  documentTypes:\n"
-                                        "\n"
-                                        "  elements:\n"
-                                        "    akomaNtoso:\n"
-                                    ),
-                                )
-                            ]
-                        }
-                    ),
-                )
-            )
+# ------------------------------------------------------------------
+# Diagnostic quick-fixes, one function per rule_id
+# ------------------------------------------------------------------
 
-        elif rule_id == "parse.missing-profile-key":
+# (uri, source, diagnostic) -> quick-fix actions for that diagnostic
+_QuickFix = Callable[[str, str, Diagnostic], list[CodeAction]]
+
+# Bare profile skeleton; ``%s`` takes the ``documentTypes`` entries, one
+# ``    - name`` line each
+_PROFILE_SCAFFOLD_TEMPLATE = (
+    "profile:\n"
+    '  name: ""\n'
+    '  version: ""\n'
+    '  description: ""\n'
+    "\n"
+    "  documentTypes:\n"
+    "%s"
+    "\n"
+    "  elements:\n"
+    "    akomaNtoso:\n"
+)
+
+# Inserted at the top of a file that has no usable ``profile:`` mapping
+_PROFILE_SCAFFOLD_TEXT = _PROFILE_SCAFFOLD_TEMPLATE % ""
+
+
+def _replace_with_actions(
+    uri: str,
+    source: str,
+    diagnostic: Diagnostic,
+    unknown: str,
+    candidates: Sequence[str],
+    cutoff: float,
+) -> list[CodeAction]:
+    """Offer 'Replace with …' for the closest *candidates* to *unknown*."""
+    line = diagnostic.range.start.line
+    actions: list[CodeAction] = []
+    for suggestion in _close_matches(unknown, candidates, 3, cutoff):
+        edit = _replace_word_edit(uri, source, line, unknown, suggestion)
+        if edit:
             actions.append(
                 CodeAction(
-                    title="Insert profile scaffold",
+                    title=f"Replace with '{suggestion}'",
                     kind=CodeActionKind.QuickFix,
                     diagnostics=[diagnostic],
-                    edit=WorkspaceEdit(
-                        changes={
-                            uri: [
-                                TextEdit(
-                                    range=Range(
-                                        start=Position(line=0, character=0),
-                                        end=Position(line=0, character=0),
-                                    ),
-                                    new_text=(
-                                        "profile:\n"
-                                        '  name: ""\n'
-                                        '  version: ""\n'
-                                        '  description: ""\n'
-                                        "\n"
-                                        "  documentTypes:\n"
-                                        "\n"
-                                        "  elements:\n"
-                                        "    akomaNtoso:\n"
-                                    ),
-                                )
-                            ]
-                        }
-                    ),
+                    edit=edit,
                 )
             )
+    return actions
 
-        elif rule_id == "identity.doctype-without-element-restriction":
-            # Extract doc type: "Document type 'act' is listed in documentTypes …"
-            dt_name = _extract_name_from_msg(msg)
-            if dt_name:
-                cascade_edit = _build_cascade_add_edit(uri, doc.source, dt_name)
-                if cascade_edit:
-                    actions.append(
-                        CodeAction(
-                            title=(f"Define '{dt_name}' with required attributes and children"),
-                            kind=CodeActionKind.QuickFix,
-                            diagnostics=[diagnostic],
-                            edit=cascade_edit,
-                            is_preferred=True,
-                        )
-                    )
 
-        elif rule_id == "strictness.missing-required-element":
-            # Extract element name: "<elemName> is on the required-child chain …"
-            m = _re.search(r"<(\w[\w-]*)>", msg)
-            if m:
-                elem_name = m.group(1)
-                cascade_edit = _build_cascade_add_edit(uri, doc.source, elem_name)
-                if cascade_edit:
-                    actions.append(
-                        CodeAction(
-                            title=(f"Define '{elem_name}' with required attributes and children"),
-                            kind=CodeActionKind.QuickFix,
-                            diagnostics=[diagnostic],
-                            edit=cascade_edit,
-                            is_preferred=True,
-                        )
-                    )
+def _define_element_actions(
+    uri: str, source: str, diagnostic: Diagnostic, name: str | None
+) -> list[CodeAction]:
+    """Offer to define *name* with its required attributes and children."""
+    if not name:
+        return []
+    cascade_edit = _build_cascade_add_edit(uri, source, name)
+    if not cascade_edit:
+        return []
+    return [
+        CodeAction(
+            title=f"Define '{name}' with required attributes and children",
+            kind=CodeActionKind.QuickFix,
+            diagnostics=[diagnostic],
+            edit=cascade_edit,
+            is_preferred=True,
+        )
+    ]
+
+
+def _fix_unknown_element(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Suggest the closest known element names for an unknown element."""
+    assert akn_schema is not None
+    unknown = _extract_name_from_msg(diagnostic.message)
+    if not unknown:
+        return []
+    return _replace_with_actions(uri, source, diagnostic, unknown, akn_schema.element_names(), 0.5)
 
-        elif rule_id == "strictness.undeclared-child-element":
-            # Extract child element name: "'childName' is listed as a child …"
-            child_name = _extract_name_from_msg(msg)
-            if child_name:
-                cascade_edit = _build_cascade_add_edit(uri, doc.source, child_name)
-                if cascade_edit:
-                    actions.append(
-                        CodeAction(
-                            title=(f"Define '{child_name}' with required attributes and children"),
-                            kind=CodeActionKind.QuickFix,
-                            diagnostics=[diagnostic],
-                            edit=cascade_edit,
-                            is_preferred=True,
-                        )
-                    )
 
-        elif rule_id == "choice.required-group-empty":
-            pass  # No quick-fix — user resolves via Add child completions
+def _fix_unknown_attribute(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Suggest the closest attributes of the owning element for an unknown attribute."""
+    assert akn_schema is not None
+    unknown = _extract_name_from_msg(diagnostic.message)
+    # The diagnostic sits on the attribute key itself, so the owning
+    # element is read from the message rather than from the YAML nesting
+    owner_m = _ATTRIBUTE_OWNER_MSG_RE.search(diagnostic.message)
+    elem_name = owner_m.group(1) if owner_m else None
+    if not (unknown and elem_name):
+        return []
+    elem_info = akn_schema.get_element_info(elem_name)
+    attr_names = elem_info.attribute_names if elem_info else ()
+    return _replace_with_actions(uri, source, diagnostic, unknown, attr_names, 0.5)
+
+
+def _fix_unknown_doctype(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Suggest the closest AKN document types for an unknown document type."""
+    assert akn_schema is not None
+    unknown = _extract_name_from_msg(diagnostic.message)
+    if not unknown:
+        return []
+    return _replace_with_actions(uri, source, diagnostic, unknown, akn_schema.document_types(), 0.4)
+
+
+def _scaffold_edit(uri: str) -> WorkspaceEdit:
+    """Return an edit inserting the profile scaffold at the top of *uri*."""
+    start = Position(line=0, character=0)
+    return WorkspaceEdit(
+        changes={
+            uri: [TextEdit(range=Range(start=start, end=start), new_text=_PROFILE_SCAFFOLD_TEXT)]
+        }
+    )
+
+
+def _fix_missing_profile(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Offer the profile scaffold for empty, non-mapping or ``profile:``-less files."""
+    return [
+        CodeAction(
+            title="Insert profile scaffold",
+            kind=CodeActionKind.QuickFix,
+            diagnostics=[diagnostic],
+            edit=_scaffold_edit(uri),
+        )
+    ]
+
+
+def _fix_doctype_without_element(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Offer to define a listed document type that has no element entry.
+
+    The message reads "Document type 'act' is listed in documentTypes …".
+    """
+    dt_name = _extract_name_from_msg(diagnostic.message)
+    return _define_element_actions(uri, source, diagnostic, dt_name)
+
+
+def _fix_missing_required_element(
+    uri: str, source: str, diagnostic: Diagnostic
+) -> list[CodeAction]:
+    """Offer to define an element on the required-child chain.
+
+    The message reads "<elemName> is on the required-child chain …".
+    """
+    m = _REQUIRED_ELEMENT_MSG_RE.search(diagnostic.message)
+    return _define_element_actions(uri, source, diagnostic, m.group(1) if m else None)
+
+
+def _fix_undeclared_child(uri: str, source: str, diagnostic: Diagnostic) -> list[CodeAction]:
+    """Offer to define a listed child that has no element entry.
+
+    The message reads "'childName' is listed as a child …".
+    """
+    child_name = _extract_name_from_msg(diagnostic.message)
+    return _define_element_actions(uri, source, diagnostic, child_name)
 
-        elif rule_id == "choice.incomplete-branches":
-            pass  # No quick-fix — user adds branches via completions
 
-        elif rule_id == "choice.exclusive-branch-conflict":
-            # Suggest using choice: to express exclusivity
-            elem_ctx = _find_element_context(doc.source, line)
-            if elem_ctx:
+def _fix_exclusive_branch_conflict(
+    uri: str, source: str, diagnostic: Diagnostic
+) -> list[CodeAction]:
+    """Offer ``choice:`` or removing a child for conflicting exclusive branches."""
+    actions: list[CodeAction] = []
+    # Suggest using choice: to express exclusivity
+    if _find_element_context(source, diagnostic.range.start.line):
+        actions.append(
+            CodeAction(
+                title="Use 'choice:' to declare exclusive branches",
+                kind=CodeActionKind.QuickFix,
+                diagnostics=[diagnostic],
+            )
+        )
+
+    # Also suggest removing conflicting children
+    conflict_m = _CONFLICT_MSG_RE.search(diagnostic.message)
+    if conflict_m:
+        for cname in (n.strip() for n in conflict_m.group(1).split(",")):
+            remove_edit = _remove_child_line_edit(uri, source, cname)
+            if remove_edit:
                 actions.append(
                     CodeAction(
-                        title="Use 'choice:' to declare exclusive branches",
+                        title=f"Remove '{cname}' to resolve conflict",
                         kind=CodeActionKind.QuickFix,
                         diagnostics=[diagnostic],
+                        edit=remove_edit,
                     )
                 )
+    return actions
 
-            # Also suggest removing conflicting children
-            import re as _re_local
-
-            conflict_m = _re_local.search(r"Conflicting: (.+)$", msg)
-            if conflict_m:
-                conflict_names = [n.strip() for n in conflict_m.group(1).split(",")]
-                for cname in conflict_names:
-                    remove_edit = _remove_child_line_edit(uri, doc.source, cname)
-                    if remove_edit:
-                        actions.append(
-                            CodeAction(
-                                title=f"Remove '{cname}' to resolve conflict",
-                                kind=CodeActionKind.QuickFix,
-                                diagnostics=[diagnostic],
-                                edit=remove_edit,
-                            )
-                        )
 
-    # ------------------------------------------------------------------
-    # Phase 2: contextual "Add …" lightbulb actions
-    # ------------------------------------------------------------------
-    actions.extend(_add_item_actions(uri, doc.source, params.range.start.line))
-
-    return actions
+# Quick-fix builder per diagnostic rule_id.  Rules without an entry have
+# no quick-fix — e.g. choice.required-group-empty and
+# choice.incomplete-branches are resolved via the Add child completions.
+_QUICK_FIXES: dict[str, _QuickFix] = {
+    "vocabulary.unknown-element": _fix_unknown_element,
+    "vocabulary.unknown-attribute": _fix_unknown_attribute,
+    "vocabulary.unknown-document-type": _fix_unknown_doctype,
+    "parse.not-a-mapping": _fix_missing_profile,
+    "parse.missing-profile-key": _fix_missing_profile,
+    "identity.doctype-without-element-restriction": _fix_doctype_without_element,
+    "strictness.missing-required-element": _fix_missing_required_element,
+    "strictness.undeclared-child-element": _fix_undeclared_child,
+    "choice.exclusive-branch-conflict": _fix_exclusive_branch_conflict,
+}
 
 
 def _extract_name_from_msg(msg: str) -> str | None:
     """Extract a quoted name from a diagnostic message like \"'foo' is not ...\"."""
-    import re
-
-    m = re.search(r"'([^']+)'", msg)
+    m = _QUOTED_NAME_MSG_RE.search(msg)
     return m.group(1) if m else None
 
 
+def _close_matches(word: str, candidates: Sequence[str], n: int, cutoff: float) -> list[str]:
+    """Return up to *n* of *candidates* most similar to *word*, best first.
+
+    Uses rapidfuzz's normalised Indel ratio when it is installed (the
+    same 0–1 similarity that difflib approximates, scaled to 0–100) and
+    falls back to ``difflib.get_close_matches`` otherwise.
+
+    Both score ``2 * M / (len(word) + len(candidate))`` with ``M`` at most
+    the shorter length, so candidates whose length alone cannot reach
+    *cutoff* are dropped before the fuzzy pass.
+    """
+    if cutoff > 0:
+        size = len(word)
+        shortest = int(size * cutoff / (2 - cutoff))
+        longest = int(size * (2 - cutoff) / cutoff) + 1
+        candidates = [c for c in candidates if shortest <= len(c) <= longest]
+        if not candidates:
+            return []
+    if _fuzz_process is None:
+        return difflib.get_close_matches(word, candidates, n=n, cutoff=cutoff)
+    matches = _fuzz_process.extract(
+        word,
+        candidates,
+        scorer=_fuzz.ratio,
+        processor=None,
+        limit=n,
+        score_cutoff=cutoff * 100,
+    )
+    return [match for match, _score, _index in matches]
+
+
+@functools.lru_cache(maxsize=256)
+def _whole_word_re(word: str) -> _re.Pattern[str]:
+    """Return a regex matching *word* only as a whole ``_WORD_RE`` word."""
+    return _re.compile(rf"(?<![\w-]){_re.escape(word)}(?![\w-])")
+
+
 def _replace_word_edit(
     uri: str, source: str, line: int, old_word: str, new_word: str
 ) -> WorkspaceEdit | None:
     """Create a WorkspaceEdit that replaces *old_word* with *new_word* on *line*."""
-    lines = source.splitlines()
+    lines = _source_lines(source)
     if line >= len(lines):
         return None
-    text = lines[line]
-    col = text.find(old_word)
-    if col < 0:
+    m = _whole_word_re(old_word).search(lines[line])
+    if m is None:
         return None
+    col = m.start()
     return WorkspaceEdit(
         changes={
             uri: [
@@ -1190,16 +1631,9 @@ def _replace_word_edit(
     )
 
 
-def _find_element_context(source: str, line: int) -> str | None:
-    """Walk backwards from *line* to find the enclosing element name.
-
-    Also checks the *current* line so that bare element entries like
-    ``body:`` (with no sub-keys) are recognised when the error line
-    points directly at the element name.
-    """
-    import re
-
-    _STRUCTURAL_NAMES = {
+# Profile keys that never name an AKN element
+_PROFILE_STRUCTURAL_KEYS = frozenset(
+    {
         "attributes",
         "children",
         "choice",
@@ -1214,27 +1648,36 @@ def _find_element_context(source: str, line: int) -> str | None:
         "version",
         "description",
     }
+)
 
-    lines = source.splitlines()
+
+def _find_element_context(source: str, line: int) -> str | None:
+    """Walk backwards from *line* to find the enclosing element name.
+
+    Also checks the *current* line so that bare element entries like
+    ``body:`` (with no sub-keys) are recognised when the error line
+    points directly at the element name.
+    """
+    lines = _source_lines(source)
     if line >= len(lines):
         return None
 
     # Check the current line first — covers bare element entries.
     cur = lines[line]
-    m = re.match(r"^\s+(\w[\w-]*):", cur)
+    m = _INDENTED_KEY_RE.match(cur)
     if m:
-        key = m.group(1)
-        if key not in _STRUCTURAL_NAMES:
+        key = m.group(2)
+        if key not in _PROFILE_STRUCTURAL_KEYS:
             return key
 
     target_indent = len(cur) - len(cur.lstrip())
     for i in range(line - 1, -1, -1):
         ln = lines[i]
         indent = len(ln) - len(ln.lstrip())
-        m = re.match(r"^\s+(\w[\w-]*):", ln)
+        m = _INDENTED_KEY_RE.match(ln)
         if m and indent < target_indent:
-            key = m.group(1)
-            if key not in _STRUCTURAL_NAMES:
+            key = m.group(2)
+            if key not in _PROFILE_STRUCTURAL_KEYS:
                 return key
     return None
 
@@ -1281,7 +1724,7 @@ def _build_child_remove_edit(
     if akn_schema is None:
         return None
 
-    raw = yaml.safe_load(source)
+    raw = _load(source)
     if not isinstance(raw, dict) or "profile" not in raw:
         return None
 
@@ -1301,23 +1744,41 @@ def _build_child_remove_edit(
     if not isinstance(children, dict) or child_name not in children:
         return None
 
+    # Step 2: Check if child_name is still referenced by any other element
+    parents_of = _parents_index(elements)
+    still_referenced = bool(parents_of.get(child_name, set()) - {parent_name})
+
+    # Fast path: when nothing but the child's own line goes away (no
+    # orphaned definitions, and children: keeps other entries), delete
+    # that line in place rather than re-emitting the whole document.
+    # This also keeps the user's comments and formatting.
+    if len(children) > 1 and (still_referenced or child_name not in elements):
+        lines = _source_lines(source)
+        line = _key_line(lines, ("profile", "elements", parent_name, "children", child_name))
+        if line is not None:
+            end = _section_end(lines, line, len(lines[line]) - len(lines[line].lstrip()))
+            return WorkspaceEdit(
+                changes={
+                    uri: [
+                        TextEdit(
+                            range=Range(
+                                start=Position(line=line, character=0),
+                                end=Position(line=end + 1, character=0),
+                            ),
+                            new_text="",
+                        )
+                    ]
+                }
+            )
+
     del children[child_name]
     if not children:
         del parent_data["children"]
-
-    # Step 2: Check if child_name is still referenced by any other element
-    still_referenced = False
-    for other_name, other_data in elements.items():
-        if not isinstance(other_data, dict):
-            continue
-        other_children = other_data.get("children")
-        if isinstance(other_children, dict) and child_name in other_children:
-            still_referenced = True
-            break
+    parents_of[child_name].discard(parent_name)
 
     # Step 3: If orphaned, remove child and its orphaned descendants
     if not still_referenced and child_name in elements:
-        to_remove = _collect_orphaned_elements(child_name, elements)
+        to_remove = _collect_orphaned_elements(child_name, elements, parents_of)
         for name in to_remove:
             elements.pop(name, None)
         # Clean up any remaining references to removed elements
@@ -1343,9 +1804,63 @@ def _build_child_remove_edit(
     return _full_document_edit(uri, source, new_text)
 
 
-def _collect_orphaned_elements(elem_name: str, elements: dict) -> set[str]:
+def _key_line(lines: Sequence[str], path: Sequence[str]) -> int | None:
+    """Return the line of the block-mapping key reached by *path*, or ``None``.
+
+    Each key of *path* is looked up among the direct entries of the
+    previous key's block, delimited by indentation.
+    """
+    start = 0
+    parent_indent = -1
+    found: int | None = None
+    for key in path:
+        found = None
+        entry_indent: int | None = None
+        for i in range(start, len(lines)):
+            text = lines[i]
+            stripped = text.lstrip(" ")
+            if not stripped or stripped.startswith("#"):
+                continue
+            indent = len(text) - len(stripped)
+            if indent <= parent_indent:
+                break  # left the enclosing block
+            if entry_indent is None:
+                entry_indent = indent
+            if indent == entry_indent:
+                m = _KEY_NAME_RE.match(text)
+                if m and m.group(1) == key:
+                    found = i
+                    break
+        if found is None or entry_indent is None:
+            return None
+        start, parent_indent = found + 1, entry_indent
+    return found
+
+
+def _parents_index(elements: dict[str, Any]) -> dict[str, set[str]]:
+    """Map each child name to the names of the elements listing it in ``children:``."""
+    parents_of: dict[str, set[str]] = {}
+    for name, data in elements.items():
+        if not isinstance(data, dict):
+            continue
+        children = data.get("children")
+        if isinstance(children, dict):
+            for child in children:
+                parents_of.setdefault(child, set()).add(name)
+    return parents_of
+
+
+def _collect_orphaned_elements(
+    elem_name: str, elements: dict[str, Any], parents_of: dict[str, set[str]] | None = None
+) -> set[str]:
     """Collect *elem_name* and all descendants that would become orphaned
-    (not referenced by any remaining element)."""
+    (not referenced by any remaining element).
+
+    *parents_of* is the ``_parents_index`` of *elements*; it is built
+    here when not supplied.
+    """
+    if parents_of is None:
+        parents_of = _parents_index(elements)
     to_remove: set[str] = {elem_name}
     queue = [elem_name]
     while queue:
@@ -1359,18 +1874,8 @@ def _collect_orphaned_elements(elem_name: str, elements: dict) -> set[str]:
         for child in children:
             if child in to_remove:
                 continue
-            # Check if any element NOT being removed still references this child
-            orphan = True
-            for other_name, other_data in elements.items():
-                if other_name in to_remove or other_name == current:
-                    continue
-                if not isinstance(other_data, dict):
-                    continue
-                other_ch = other_data.get("children")
-                if isinstance(other_ch, dict) and child in other_ch:
-                    orphan = False
-                    break
-            if orphan and child in elements:
+            # Orphaned unless an element NOT being removed still references it
+            if child in elements and parents_of.get(child, set()) <= to_remove:
                 to_remove.add(child)
                 queue.append(child)
     return to_remove
@@ -1380,7 +1885,7 @@ def _full_document_edit(uri: str, old_source: str, new_text: str) -> WorkspaceEd
     """Replace the entire document content."""
     if new_text == old_source:
         return None
-    lines = old_source.splitlines()
+    lines = _source_lines(old_source)
     last_line = max(0, len(lines) - 1)
     last_char = len(lines[last_line]) if lines else 0
     return WorkspaceEdit(
@@ -1402,9 +1907,9 @@ def _remove_child_line_edit(uri: str, source: str, child_name: str) -> Workspace
     """Build a WorkspaceEdit that removes the line declaring *child_name*
     from a ``children:`` section.
     """
-    lines = source.splitlines()
+    lines = _source_lines(source)
     for i, text in enumerate(lines):
-        m = _re.match(r"^(\s+)([\w][\w-]*)\s*:", text)
+        m = _INDENTED_KEY_RE.match(text)
         if m and m.group(2) == child_name:
             # Remove the entire line (including the newline)
             return WorkspaceEdit(
@@ -1423,7 +1928,7 @@ def _remove_child_line_edit(uri: str, source: str, child_name: str) -> Workspace
     return None
 
 
-def _child_name_at_line(lines: list[str], line_idx: int, expected_indent: int) -> str | None:
+def _child_name_at_line(lines: Sequence[str], line_idx: int, expected_indent: int) -> str | None:
     """Extract the child element name from a children: entry line.
 
     Children entries look like ``        meta:`` or ``        meta: 1..1``
@@ -1438,7 +1943,7 @@ def _child_name_at_line(lines: list[str], line_idx: int, expected_indent: int) -
     ind = len(text) - len(stripped)
     if ind != expected_indent:
         return None
-    m = _re.match(r"^\s*([\w][\w-]*)\s*:", text)
+    m = _KEY_NAME_RE.match(text)
     return m.group(1) if m else None
 
 
@@ -1446,27 +1951,8 @@ def _child_name_at_line(lines: list[str], line_idx: int, expected_indent: int) -
 # Helpers for contextual "Add …" lightbulb actions
 # ------------------------------------------------------------------
 
-# Subsection keys that are NOT element names
-_PROFILE_KEYS = frozenset(
-    {
-        "attributes",
-        "children",
-        "choice",
-        "structure",
-        "required",
-        "values",
-        "elements",
-        "profile",
-        "profileNote",
-        "documentTypes",
-        "name",
-        "version",
-        "description",
-    }
-)
 
-
-def _section_end(lines: list[str], start: int, indent: int) -> int:
+def _section_end(lines: Sequence[str], start: int, indent: int) -> int:
     """Return the last content line belonging to the block starting at *start*."""
     last = start
     for i in range(start + 1, len(lines)):
@@ -1524,20 +2010,38 @@ def _make_add_action(
     )
 
 
-def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeAction]:
-    """Return contextual 'Add …' code actions for the current cursor line."""
-    assert akn_schema is not None
-    lines = source.splitlines()
-    if not lines:
-        return []
+@dataclasses.dataclass(frozen=True)
+class _SectionLayout:
+    """Where the ``documentTypes:`` and ``elements:`` sections of a profile lie.
+
+    Line numbers are 0-based; a section that is absent has ``None`` for
+    its header line.  ``element_entries`` lists each ``(line, end, name)``
+    entry of the elements section in document order.
+    """
+
+    doc_types_line: int | None = None
+    doc_types_indent: int = 0
+    doc_types_end: int = -1
+    elements_line: int | None = None
+    elements_indent: int = 0
+    elements_end: int = -1
+    element_entries: tuple[tuple[int, int, str], ...] = ()
 
-    actions: list[CodeAction] = []
+
+@functools.lru_cache(maxsize=8)
+def _section_layout(source: str) -> _SectionLayout:
+    """Locate the sections 'Add …' actions apply to, once per document text.
+
+    Editors request code actions on every cursor move, so the document
+    scan is shared by every request against the same text.
+    """
+    lines = _source_lines(source)
 
     # --- Locate top-level sections ---
     doc_types_line: int | None = None
-    doc_types_indent: int | None = None
+    doc_types_indent = 0
     elements_line: int | None = None
-    elements_indent: int | None = None
+    elements_indent = 0
 
     for idx, lt in enumerate(lines):
         stripped = lt.strip()
@@ -1551,30 +2055,21 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
             elements_line = idx
             elements_indent = indent
 
-    # --- documentTypes section ---
-    if doc_types_line is not None and doc_types_indent is not None:
-        dt_end = _section_end(lines, doc_types_line, doc_types_indent)
-        if doc_types_line <= cursor_line <= dt_end:
-            item_indent = doc_types_indent + 4  # "    - "
-            actions.append(
-                _make_add_action(
-                    "Add document type",
-                    uri,
-                    dt_end,
-                    item_indent,
-                    is_preferred=True,
-                )
-            )
+    doc_types_end = -1
+    if doc_types_line is not None:
+        doc_types_end = _section_end(lines, doc_types_line, doc_types_indent)
 
-    # --- elements section ---
-    if elements_line is None or elements_indent is None:
-        return actions
+    if elements_line is None:
+        return _SectionLayout(doc_types_line, doc_types_indent, doc_types_end)
 
     elem_indent = elements_indent + 2
-    sub_indent = elem_indent + 2
 
-    # Build list of element entries
-    element_entries: list[tuple[int, str]] = []  # (line, name)
+    # One pass over the elements section collects every entry with the
+    # last content line of its block, and the section's own last line.
+    # An entry's block ends at the next line indented no deeper than it.
+    element_entries: list[tuple[int, int, str]] = []  # (line, end, name)
+    open_entry: tuple[int, str] | None = None
+    elements_end = elements_line
     for i in range(elements_line + 1, len(lines)):
         stripped = lines[i].strip()
         if not stripped:
@@ -1582,12 +2077,73 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
         ind = len(lines[i]) - len(stripped)
         if ind <= elements_indent:
             break
-        if ind == elem_indent:
-            m = _re.match(r"^\s*([\w][\w-]*)\s*:", lines[i])
-            if m:
-                element_entries.append((i, m.group(1)))
+        if ind <= elem_indent:
+            if open_entry is not None:
+                element_entries.append((open_entry[0], elements_end, open_entry[1]))
+                open_entry = None
+            if ind == elem_indent:
+                m = _KEY_NAME_RE.match(lines[i])
+                if m:
+                    open_entry = (i, m.group(1))
+        elements_end = i
+    if open_entry is not None:
+        element_entries.append((open_entry[0], elements_end, open_entry[1]))
+
+    return _SectionLayout(
+        doc_types_line,
+        doc_types_indent,
+        doc_types_end,
+        elements_line,
+        elements_indent,
+        elements_end,
+        tuple(element_entries),
+    )
+
+
+def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeAction]:
+    """Return contextual 'Add …' code actions for the current cursor line."""
+    assert akn_schema is not None
+    lines = _source_lines(source)
+    if not lines:
+        return []
+
+    layout = _section_layout(source)
+    in_doc_types = (
+        layout.doc_types_line is not None
+        and layout.doc_types_line <= cursor_line <= layout.doc_types_end
+    )
+    # "Add element" is also offered on the line just past the section
+    in_elements = (
+        layout.elements_line is not None
+        and layout.elements_line <= cursor_line <= layout.elements_end + 1
+    )
+    if not (in_doc_types or in_elements):
+        return []
+
+    actions: list[CodeAction] = []
+
+    # --- documentTypes section ---
+    if in_doc_types:
+        item_indent = layout.doc_types_indent + 4  # "    - "
+        actions.append(
+            _make_add_action(
+                "Add document type",
+                uri,
+                layout.doc_types_end,
+                item_indent,
+                is_preferred=True,
+            )
+        )
 
-    elements_end = _section_end(lines, elements_line, elements_indent)
+    # --- elements section ---
+    if not in_elements:
+        return actions
+
+    elements_line = layout.elements_line
+    elements_end = layout.elements_end
+    element_entries = layout.element_entries
+    elem_indent = layout.elements_indent + 2
+    sub_indent = elem_indent + 2
 
     # Cursor on "elements:" header or past last element → "Add element"
     if cursor_line == elements_line:
@@ -1603,24 +2159,20 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
         return actions
 
     # --- Per-element analysis ---
-    for eline, ename in element_entries:
-        eend = eline
-        for i in range(eline + 1, len(lines)):
-            stripped = lines[i].strip()
-            if not stripped:
-                continue
-            if (len(lines[i]) - len(stripped)) <= elem_indent:
-                break
-            eend = i
-
-        if not (eline <= cursor_line <= eend):
-            continue
+    # Only the element whose block contains the cursor matters: the last
+    # entry starting at or before the cursor line, found by bisection.
+    at = bisect_right(element_entries, cursor_line, key=itemgetter(0)) - 1
+    entry = element_entries[at] if at >= 0 else None
+    if entry is not None and cursor_line <= entry[1]:
+        eline, eend, ename = entry
 
         # Scan sub-sections of this element
         has_children = has_attributes = has_structure = False
         children_line = children_end = -1
         attributes_line = attributes_end = -1
         structure_line = structure_end = -1
+        profile_note_line = -1
+        has_profile_note = False
 
         for i in range(eline + 1, eend + 1):
             stripped = lines[i].strip()
@@ -1640,24 +2192,15 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
                     has_structure = True
                     structure_line = i
                     structure_end = _section_end(lines, i, sub_indent)
+                elif not has_profile_note and stripped.startswith("profileNote:"):
+                    has_profile_note = True
+                    profile_note_line = i
 
         # Determine which sub-section the cursor is inside
         in_children = has_children and children_line <= cursor_line <= children_end
         in_attributes = has_attributes and attributes_line <= cursor_line <= attributes_end
         in_structure = has_structure and structure_line <= cursor_line <= structure_end
 
-        # Detect profileNote line
-        profile_note_line = -1
-        has_profile_note = False
-        for i in range(eline + 1, eend + 1):
-            stripped_i = lines[i].strip()
-            if not stripped_i:
-                continue
-            ind_i = len(lines[i]) - len(stripped_i)
-            if ind_i == sub_indent and stripped_i.startswith("profileNote:"):
-                has_profile_note = True
-                profile_note_line = i
-                break
         in_profile_note = has_profile_note and cursor_line == profile_note_line
 
         # Detect choice: block within children:
@@ -1770,7 +2313,7 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
         # --- Remove child under cursor ---
         if in_children:
             child_on_cursor = _child_name_at_line(lines, cursor_line, sub_indent + 2)
-            if child_on_cursor and child_on_cursor not in _PROFILE_KEYS:
+            if child_on_cursor and child_on_cursor not in _PROFILE_STRUCTURAL_KEYS:
                 remove_edit = _build_child_remove_edit(uri, source, ename, child_on_cursor)
                 if remove_edit:
                     actions.append(
@@ -1815,21 +2358,10 @@ def _add_item_actions(uri: str, source: str, cursor_line: int) -> list[CodeActio
                 )
             )
 
-        # Only process the element whose range contains the cursor
-        break
-
     # If cursor is past last element but still in elements: section,
     # offer "Add element"
     if element_entries:
-        last_eline, _ = element_entries[-1]
-        last_eend = last_eline
-        for i in range(last_eline + 1, len(lines)):
-            stripped = lines[i].strip()
-            if not stripped:
-                continue
-            if (len(lines[i]) - len(stripped)) <= elem_indent:
-                break
-            last_eend = i
+        last_eend = element_entries[-1][1]
         if cursor_line > last_eend and cursor_line <= elements_end + 1:
             actions.append(
                 _make_add_action(
@@ -1886,6 +2418,13 @@ _STRUCTURAL_KEYS = {
     "profileNote",
 }
 
+# "key:", "key: value" or "key:  # comment"; groups: indent, key, rest
+_TOKEN_KEY_RE = _re.compile(r"^(\s*)([\w][\w-]*)\s*:(.*)")
+# "- value" or "- value # comment"; groups: indent, value
+_TOKEN_LIST_ITEM_RE = _re.compile(r"^(\s*)-\s+(\S+)")
+# Cardinality values: "1..1", "0..*", etc. (optionally quoted)
+_CARDINALITY_RE = _re.compile(r'^["\']?(\d+\.\.(?:\d+|\*))["\'\s]?')
+
 
 @server.feature(
     TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
@@ -1913,18 +2452,15 @@ def _build_semantic_tokens(source: str) -> list[int]:
     if akn_schema is None:
         return []
 
-    lines = source.splitlines()
+    lines = _source_lines(source)
     tokens: list[tuple[int, int, int, int, int]] = []  # (line, col, len, type, mod)
 
-    known_elements = set(akn_schema.element_names())
-    known_doctypes = set(akn_schema.get_children("akomaNtoso"))
+    is_element = akn_schema.has_element
+    known_doctypes = akn_schema.document_types()
 
     # Track context via indentation-based section stack
     section_stack: list[tuple[int, str]] = []  # (indent, section_key)
 
-    # Regex for cardinality values: "1..1", "0..*", etc.
-    _cardinality_re = _re.compile(r'^["\']?(\d+\.\.(?:\d+|\*))["\'\s]?')
-
     for line_idx, line_text in enumerate(lines):
         stripped = line_text.lstrip()
         if not stripped or stripped.startswith("#"):
@@ -1937,7 +2473,7 @@ def _build_semantic_tokens(source: str) -> list[int]:
             section_stack.pop()
 
         # Match "key:" or "key: value" or "key:  # comment"
-        key_m = _re.match(r"^(\s*)([\w][\w-]*)\s*:(.*)", line_text)
+        key_m = _TOKEN_KEY_RE.match(line_text)
         if key_m:
             key = key_m.group(2)
             col = len(key_m.group(1))
@@ -1950,14 +2486,14 @@ def _build_semantic_tokens(source: str) -> list[int]:
             if parent_section == "attributes" and key not in ("required", "values"):
                 # Under attributes:, all keys except required/values are
                 # attribute names — Property (yellow), regardless of whether
-                # they also appear in _STRUCTURAL_KEYS or known_elements.
+                # they also appear in _STRUCTURAL_KEYS or are AKN elements.
                 tokens.append((line_idx, col, length, 1, 0))
-            elif parent_section == "choice" and key in known_elements:
+            elif parent_section == "choice" and is_element(key):
                 # Choice branch element — Type (light blue) + cardinality
                 tokens.append((line_idx, col, length, 5, 0))
                 if rest:
                     comment_stripped = rest.split("#")[0].strip()
-                    card_m = _cardinality_re.match(comment_stripped)
+                    card_m = _CARDINALITY_RE.match(comment_stripped)
                     if card_m:
                         card_val = card_m.group(1)
                         card_start = line_text.find(card_val, col + length)
@@ -1974,7 +2510,7 @@ def _build_semantic_tokens(source: str) -> list[int]:
                         bool_start = line_text.find(bool_val, col + length)
                         if bool_start >= 0:
                             tokens.append((line_idx, bool_start, len(bool_val), 7, 0))
-            elif key in known_elements:
+            elif is_element(key):
                 # Determine context from section stack
                 if parent_section == "children":
                     # Child reference — distinct type (5 = Type)
@@ -1982,7 +2518,7 @@ def _build_semantic_tokens(source: str) -> list[int]:
                     # Tokenize cardinality value if present (e.g., "1..1")
                     if rest:
                         comment_stripped = rest.split("#")[0].strip()
-                        card_m = _cardinality_re.match(comment_stripped)
+                        card_m = _CARDINALITY_RE.match(comment_stripped)
                         if card_m:
                             # Find position of the cardinality in the original line
                             card_val = card_m.group(1)
@@ -1996,7 +2532,7 @@ def _build_semantic_tokens(source: str) -> list[int]:
             continue
 
         # Match list items: "- value" or "- value # comment"
-        list_m = _re.match(r"^(\s*)-\s+(\S+)", line_text)
+        list_m = _TOKEN_LIST_ITEM_RE.match(line_text)
         if list_m:
             val = list_m.group(2)
             col = len(list_m.group(1)) + 2  # after "- "
@@ -2005,7 +2541,7 @@ def _build_semantic_tokens(source: str) -> list[int]:
             parent_section = section_stack[-1][1] if section_stack else ""
             if clean_val in known_doctypes:
                 tokens.append((line_idx, col, len(clean_val), 3, 0))
-            elif clean_val in known_elements:
+            elif is_element(clean_val):
                 # Element name in a list (e.g., structure levels)
                 if parent_section == "structure":
                     tokens.append((line_idx, col, len(clean_val), 5, 0))
@@ -2075,18 +2611,7 @@ def cmd_initialize_profile(doc_type: str = "act") -> str:
         return ""
 
     # 1. Build a bare scaffold
-    scaffold = (
-        "profile:\n"
-        '  name: ""\n'
-        '  version: ""\n'
-        '  description: ""\n'
-        "\n"
-        "  documentTypes:\n"
-        f"    - {doc_type}\n"
-        "\n"
-        "  elements:\n"
-        "    akomaNtoso:\n"
-    )
+    scaffold = _PROFILE_SCAFFOLD_TEMPLATE % f"    - {doc_type}\n"
 
     # 2. Recursively expand the selected document type
     return expand_element(
@@ -2236,7 +2761,7 @@ def _add_identity_attrs_to_profile(
     if akn_schema is None:
         return source
 
-    raw = yaml.safe_load(source)
+    raw = _load(source)
     if not isinstance(raw, dict) or "profile" not in raw:
         return source
 
@@ -2295,7 +2820,7 @@ def _remove_identity_attrs_from_profile(source: str, attr_names: list[str]) -> s
     if akn_schema is None:
         return source
 
-    raw = yaml.safe_load(source)
+    raw = _load(source)
     if not isinstance(raw, dict) or "profile" not in raw:
         return source
 
@@ -64,9 +64,9 @@ def _check_required_group_empty(
             continue
 
         choice_groups = schema.get_choice_groups(elem_name)
-        # Build set of ALL declared children (always-present + all branches)
-        all_declared: set[str] = set(restriction.children.keys())
-        all_declared.update(restriction.exclusive_children.keys())
+        # ALL declared children: always-present + all branches
+        declared = restriction.children
+        declared_branches = restriction.exclusive_children
 
         elem_path = f"profile.elements.{elem_name}"
 
@@ -74,7 +74,8 @@ def _check_required_group_empty(
             if cg.min_occurs < 1:
                 continue  # optional choice — no requirement
 
-            if not (cg.all_elements & all_declared):
+            members = cg.all_elements
+            if members.isdisjoint(declared) and members.isdisjoint(declared_branches):
                 # Build a helpful message listing example members
                 branch_descriptions: list[str] = []
                 for branch in cg.branches:
@@ -190,7 +191,7 @@ def _check_exclusive_branch_conflict(
             continue
 
         choice_groups = schema.get_choice_groups(elem_name)
-        declared_children = set(restriction.children.keys())
+        declared_children = restriction.children.keys()
         elem_path = f"profile.elements.{elem_name}"
 
         for cg in choice_groups:
@@ -200,7 +201,7 @@ def _check_exclusive_branch_conflict(
             # Which branches have members in *always-present* children?
             active_branches: list[tuple[str, frozenset[str]]] = []
             for branch in cg.branches:
-                overlap = branch.elements & declared_children
+                overlap = branch.elements.intersection(declared_children)
                 if overlap:
                     label = branch.label or branch.branch_id
                     active_branches.append((label, overlap))
@@ -297,7 +298,7 @@ def _check_branch_overlap(
             continue
 
         elem_path = f"profile.elements.{elem_name}"
-        always_present = set(restriction.children.keys())
+        always_present = restriction.children
 
         for child_name in restriction.exclusive_children:
             if child_name in always_present:
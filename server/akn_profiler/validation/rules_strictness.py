@@ -56,12 +56,11 @@ def _check_required_children(
             # No explicit children list — nothing to check
             continue
 
-        if not schema.has_element(elem_name):
+        info = schema.get_element_info(elem_name)
+        if info is None:
             continue
 
-        req_children = {c.name for c in schema.get_required_children(elem_name)}
-        listed_children = set(restriction.children.keys())
-        missing = req_children - listed_children
+        missing = info.required_child_names.difference(restriction.children)
 
         elem_path = f"profile.elements.{elem_name}.children"
         for child_name in sorted(missing):
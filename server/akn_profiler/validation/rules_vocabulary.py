@@ -41,7 +41,7 @@ def _check_document_types(
 ) -> list[ValidationError]:
     """Every ``documentTypes`` entry must be a child of ``<akomaNtoso>``."""
     errors: list[ValidationError] = []
-    valid_doc_types = set(schema.get_children("akomaNtoso"))
+    valid_doc_types = set(schema.document_types())
 
     for i, dt in enumerate(profile.documentTypes):
         path = f"profile.documentTypes[{i}]"
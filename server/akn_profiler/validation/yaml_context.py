@@ -62,13 +62,13 @@ class CursorContext:
     indent_level: int = 0
     """Number of leading spaces on the current line."""
 
-    existing_keys: list[str] = dataclasses.field(default_factory=list)
+    existing_keys: frozenset[str] = frozenset()
     """Sibling keys already present at the same indent level.
 
     Used to exclude already-defined items from completions.
     """
 
-    cross_block_keys: list[str] = dataclasses.field(default_factory=list)
+    cross_block_keys: frozenset[str] = frozenset()
     """Keys from a related sibling block that should also be excluded.
 
     When in ``CHILDREN`` scope, this contains keys under ``choice:``.
@@ -177,8 +177,8 @@ def resolve_context(source: str, line: int, character: int) -> CursorContext:
         element_name=elem_name,
         attribute_name=attr_name,
         indent_level=cur_indent,
-        existing_keys=existing_keys,
-        cross_block_keys=cross_block_keys,
+        existing_keys=frozenset(existing_keys),
+        cross_block_keys=frozenset(cross_block_keys),
         line_text=current_line,
     )
 
@@ -13,10 +13,16 @@ Public API
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 import yaml
 from pydantic import ValidationError as PydanticValidationError
 
+try:  # Prefer the libyaml C backend — an order of magnitude faster
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover — PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 from akn_profiler.models.profile import ProfileDocument
 from akn_profiler.validation.errors import Severity, ValidationError
 
@@ -26,8 +32,8 @@ logger = logging.getLogger(__name__)
 class LineIndex:
     """Maps YAML key paths to their 1-based source line numbers.
 
-    Built during YAML loading by using ``yaml.compose()`` which returns
-    a node tree that retains ``start_mark`` positions.
+    Built from the composed node tree, which retains ``start_mark``
+    positions, before that same tree is constructed into Python data.
     """
 
     def __init__(self) -> None:
@@ -61,16 +67,41 @@ def _walk_node(node: yaml.Node, prefix: str, index: LineIndex) -> None:
             _walk_node(item_node, path, index)
 
 
-def _build_line_index(yaml_text: str) -> LineIndex:
-    """Compose the YAML and record line numbers for every key."""
-    index = LineIndex()
+def _load_with_line_index(yaml_text: str, index: LineIndex) -> Any:
+    """Parse *yaml_text* once, recording key lines into *index*.
+
+    The text is composed into a node tree a single time; the line index
+    is read off that tree and the same tree is then constructed into
+    Python data, instead of scanning the text once for each.
+
+    Raises ``yaml.YAMLError`` on syntax errors (the index is left empty).
+    """
+    loader = _SafeLoader(yaml_text)
+    try:
+        root = loader.get_single_node()
+        if root is None:
+            return None
+        _walk_node(root, "", index)
+        return loader.construct_document(root)
+    finally:
+        loader.dispose()
+
+
+def _syntax_error(yaml_text: str, exc: yaml.YAMLError) -> yaml.YAMLError:
+    """Return the pure-Python loader's report of the syntax error *exc*.
+
+    libyaml words its errors differently and omits the source snippet,
+    so a broken document is re-read with ``yaml.SafeLoader`` (only on
+    this error path) to keep the diagnostic text independent of the
+    backend in use.
+    """
+    if not yaml.__with_libyaml__:
+        return exc
     try:
-        root = yaml.compose(yaml_text, Loader=yaml.SafeLoader)
-        if root is not None:
-            _walk_node(root, "", index)
-    except yaml.YAMLError:
-        pass  # syntax errors are reported separately
-    return index
+        yaml.load(yaml_text, Loader=yaml.SafeLoader)
+    except yaml.YAMLError as python_exc:
+        return python_exc
+    return exc
 
 
 def parse_profile(
@@ -86,13 +117,14 @@ def parse_profile(
         validation errors.  ``line_index`` maps YAML paths → line
         numbers regardless of whether parsing succeeded.
     """
-    line_index = _build_line_index(yaml_text)
+    line_index = LineIndex()
     errors: list[ValidationError] = []
 
     # --- Step 1: YAML syntax ----------------------------------------
     try:
-        raw = yaml.safe_load(yaml_text)
+        raw = _load_with_line_index(yaml_text, line_index)
     except yaml.YAMLError as exc:
+        exc = _syntax_error(yaml_text, exc)
         line: int | None = None
         if hasattr(exc, "problem_mark") and exc.problem_mark is not None:
             line = exc.problem_mark.line + 1
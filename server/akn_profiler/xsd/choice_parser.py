@@ -80,6 +80,8 @@ class ChoiceGroup:
         one branch and cannot mix elements from different branches.
     branches
         The branches of this choice.
+    all_elements
+        Union of elements across all branches (derived, not an argument).
     """
 
     group_id: str
@@ -88,13 +90,12 @@ class ChoiceGroup:
     exclusive: bool
     branches: tuple[ChoiceBranch, ...]
 
-    @property
-    def all_elements(self) -> frozenset[str]:
-        """Union of elements across all branches."""
-        result: set[str] = set()
-        for b in self.branches:
-            result |= b.elements
-        return frozenset(result)
+    all_elements: frozenset[str] = dataclasses.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "all_elements", frozenset().union(*(b.elements for b in self.branches))
+        )
 
 
 # ------------------------------------------------------------------
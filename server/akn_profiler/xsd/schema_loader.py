@@ -11,8 +11,9 @@ Usage:
     schema = AknSchema.load()
     schema.has_element("act")               # True
     schema.has_element("foobar")            # False
-    schema.get_children("akomaNtoso")       # ['act', 'bill', 'debate', ...]
-    schema.get_attributes("block")          # [AttrInfo(name='class', ...)]
+    schema.get_children("akomaNtoso")       # ('act', 'bill', 'debate', ...)
+    schema.document_types()                 # ('act', 'bill', 'debate', ...)
+    schema.get_attributes("block")          # (AttrInfo(name='class', ...), ...)
     schema.get_element_info("article")      # ElementInfo(...)
 """
 
@@ -22,6 +23,7 @@ import dataclasses
 import inspect
 import logging
 import re
+from collections.abc import Iterable
 from dataclasses import fields
 from enum import Enum
 from pathlib import Path
@@ -109,8 +111,8 @@ class AttrInfo:
     type_hint: str
     """String representation of the Python type annotation."""
 
-    enum_values: list[str]
-    """If the type is an Enum, the list of allowed string values; else empty."""
+    enum_values: tuple[str, ...]
+    """If the type is an Enum, the allowed string values; else empty."""
 
     pattern: str | None = None
     """XSD ``xs:pattern`` facet regex, if any (e.g. ``[^\\s]+`` for eId)."""
@@ -175,10 +177,10 @@ class ElementInfo:
     parent_classes: list[str]
     """Base class names in the MRO (excluding object)."""
 
-    attributes: list[AttrInfo]
+    attributes: tuple[AttrInfo, ...]
     """All XML attributes available on this element."""
 
-    children: list[ChildInfo]
+    children: tuple[ChildInfo, ...]
     """All child XML elements this element can contain."""
 
     namespace: str
@@ -190,6 +192,125 @@ class ElementInfo:
     choice_groups: tuple["ChoiceGroup", ...] = ()
     """Choice group constraints from the content model."""
 
+    attributes_by_name: dict[str, AttrInfo] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """``attributes`` indexed by XML name (derived)."""
+
+    children_by_name: dict[str, ChildInfo] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """``children`` indexed by XML name (derived)."""
+
+    attribute_names: tuple[str, ...] = dataclasses.field(init=False, repr=False, compare=False)
+    """Names of ``attributes``, in XSD order (derived)."""
+
+    child_names: tuple[str, ...] = dataclasses.field(init=False, repr=False, compare=False)
+    """Names of ``children``, in XSD order (derived)."""
+
+    required_attributes: tuple[AttrInfo, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Subset of ``attributes`` that the XSD requires (derived)."""
+
+    required_children: tuple[ChildInfo, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Subset of ``children`` that the XSD requires, in XSD order (derived)."""
+
+    required_child_names: frozenset[str] = dataclasses.field(init=False, repr=False, compare=False)
+    """Names of ``required_children`` (derived)."""
+
+    optional_child_names: tuple[str, ...] = dataclasses.field(init=False, repr=False, compare=False)
+    """Names of the remaining children, in XSD order (derived)."""
+
+    xsd_child_rank: dict[str, tuple[int, int]] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Canonical sort key per child: ``(0 if required else 1, xsd_index)`` (derived)."""
+
+    xsd_attr_rank: dict[str, tuple[int, int]] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Canonical sort key per attribute, same scheme as ``xsd_child_rank`` (derived)."""
+
+    exclusive_choice: ChoiceGroup | None = dataclasses.field(init=False, repr=False, compare=False)
+    """First exclusive (pick-one-branch) choice group, if any (derived)."""
+
+    exclusive_choice_children: tuple[ChildInfo, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """All children inside ``exclusive_choice``, in branch order (derived)."""
+
+    exclusive_required_children: tuple[ChildInfo, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Required children inside ``exclusive_choice``, in branch order (derived)."""
+
+    plain_required_children: tuple[ChildInfo, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+    """Required children outside ``exclusive_choice``, in XSD order (derived)."""
+
+    choice_group_labels: dict[str, str] = dataclasses.field(init=False, repr=False, compare=False)
+    """Child name → label of the first choice branch containing it (derived)."""
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "attributes_by_name", {a.name: a for a in self.attributes})
+        object.__setattr__(self, "children_by_name", {c.name: c for c in self.children})
+        object.__setattr__(self, "attribute_names", tuple(a.name for a in self.attributes))
+        object.__setattr__(self, "child_names", tuple(c.name for c in self.children))
+        object.__setattr__(
+            self, "required_attributes", tuple(a for a in self.attributes if a.required)
+        )
+        object.__setattr__(self, "required_children", tuple(c for c in self.children if c.required))
+        required_names = frozenset(c.name for c in self.required_children)
+        object.__setattr__(self, "required_child_names", required_names)
+        object.__setattr__(
+            self,
+            "optional_child_names",
+            tuple(c.name for c in self.children if c.name not in required_names),
+        )
+        object.__setattr__(
+            self,
+            "xsd_child_rank",
+            {c.name: (0 if c.required else 1, i) for i, c in enumerate(self.children)},
+        )
+        object.__setattr__(
+            self,
+            "xsd_attr_rank",
+            {a.name: (0 if a.required else 1, i) for i, a in enumerate(self.attributes)},
+        )
+
+        exclusive = next((cg for cg in self.choice_groups if cg.exclusive), None)
+        members: dict[str, ChildInfo] = {}
+        if exclusive is not None:
+            for branch in exclusive.branches:
+                for c in self.children:
+                    if c.name in branch.elements:
+                        members.setdefault(c.name, c)
+        object.__setattr__(self, "exclusive_choice", exclusive)
+        object.__setattr__(self, "exclusive_choice_children", tuple(members.values()))
+        object.__setattr__(
+            self,
+            "exclusive_required_children",
+            tuple(c for c in self.exclusive_choice_children if c.required),
+        )
+        exclusive_members = exclusive.all_elements if exclusive is not None else frozenset()
+        object.__setattr__(
+            self,
+            "plain_required_children",
+            tuple(c for c in self.required_children if c.name not in exclusive_members),
+        )
+
+        labels: dict[str, str] = {}
+        for cg in self.choice_groups:
+            for branch in cg.branches:
+                label = branch.label or branch.branch_id
+                for member in branch.elements:
+                    labels.setdefault(member, label)
+        object.__setattr__(self, "choice_group_labels", labels)
+
 
 class AknSchema:
     """
@@ -208,6 +329,10 @@ class AknSchema:
         self._enums: dict[str, list[str]] = {}
         # attribute xml_name -> documentation from XSD attribute group
         self._attr_docs: dict[str, str] = {}
+        # Derived name views, computed on first use (the schema is
+        # immutable once loaded)
+        self._element_names: tuple[str, ...] | None = None
+        self._document_types: tuple[str, ...] | None = None
 
     # ------------------------------------------------------------------
     # Factory
@@ -244,34 +369,57 @@ class AknSchema:
         """Return full element information, or None if not found."""
         return self._elements.get(xml_name)
 
-    def get_children(self, xml_name: str) -> list[str]:
+    def get_element_infos(self, xml_names: Iterable[str]) -> dict[str, ElementInfo]:
+        """Return element information for each known name in *xml_names*.
+
+        Unknown names are left out.  Lets a caller fetch a whole list of
+        children in one call instead of one lookup per name.
+        """
+        elements = self._elements
+        return {name: info for name in xml_names if (info := elements.get(name)) is not None}
+
+    # The accessors below hand out the tuples stored on ElementInfo, so
+    # repeated calls on the per-keystroke paths allocate nothing.
+
+    def get_children(self, xml_name: str) -> tuple[str, ...]:
         """Return XML names of allowed child elements for *xml_name*."""
         info = self._elements.get(xml_name)
         if info is None:
-            return []
-        return [c.name for c in info.children]
+            return ()
+        return info.child_names
 
-    def get_attributes(self, xml_name: str) -> list[AttrInfo]:
+    def get_attributes(self, xml_name: str) -> tuple[AttrInfo, ...]:
         """Return attribute descriptors for *xml_name*."""
         info = self._elements.get(xml_name)
         if info is None:
-            return []
-        return list(info.attributes)
+            return ()
+        return info.attributes
 
-    def get_required_attributes(self, xml_name: str) -> list[AttrInfo]:
+    def get_required_attributes(self, xml_name: str) -> tuple[AttrInfo, ...]:
         """Return only the required attributes for *xml_name*."""
-        return [a for a in self.get_attributes(xml_name) if a.required]
+        info = self._elements.get(xml_name)
+        if info is None:
+            return ()
+        return info.required_attributes
 
-    def get_required_children(self, xml_name: str) -> list[ChildInfo]:
+    def get_required_children(self, xml_name: str) -> tuple[ChildInfo, ...]:
         """Return only the required child elements for *xml_name*."""
         info = self._elements.get(xml_name)
         if info is None:
-            return []
-        return [c for c in info.children if c.required]
+            return ()
+        return info.required_children
 
-    def element_names(self) -> list[str]:
+    def element_names(self) -> tuple[str, ...]:
         """Return all known AKN element XML names, sorted."""
-        return sorted(self._elements)
+        if self._element_names is None:
+            self._element_names = tuple(sorted(self._elements))
+        return self._element_names
+
+    def document_types(self) -> tuple[str, ...]:
+        """Return the valid document types (children of ``akomaNtoso``)."""
+        if self._document_types is None:
+            self._document_types = self.get_children("akomaNtoso")
+        return self._document_types
 
     def get_enum_values(self, enum_class_name: str) -> list[str] | None:
         """Return the allowed string values for an enum type, or None."""
@@ -341,8 +489,8 @@ class AknSchema:
                 xml_name=xml_name,
                 class_name=name,
                 parent_classes=parents,
-                attributes=attrs,
-                children=children,
+                attributes=tuple(attrs),
+                children=tuple(children),
                 namespace=ns,
                 doc=self._extract_doc(obj),
             )
@@ -409,7 +557,7 @@ class AknSchema:
             # Replace the ElementInfo with an updated copy
             self._elements[xml_name] = dataclasses.replace(
                 info,
-                children=new_children,
+                children=tuple(new_children),
                 choice_groups=tuple(unique_groups),
             )
 
@@ -570,23 +718,23 @@ class AknSchema:
             return hint
         return getattr(hint, "__name__", str(hint))
 
-    def _enum_values_for_field(self, f: dataclasses.Field) -> list[str]:  # type: ignore[type-arg]
+    def _enum_values_for_field(self, f: dataclasses.Field) -> tuple[str, ...]:  # type: ignore[type-arg]
         """If the field's type is an Enum, return its allowed values."""
         hint = f.type
         if isinstance(hint, str):
             # Resolve forward reference against the generated module
             resolved = getattr(gen, hint, None)
             if resolved and inspect.isclass(resolved) and issubclass(resolved, Enum):
-                return [m.value for m in resolved]
+                return tuple(m.value for m in resolved)
             # Handle 'None | EnumType' patterns
             for part in hint.split("|"):
                 part = part.strip()
                 resolved = getattr(gen, part, None)
                 if resolved and inspect.isclass(resolved) and issubclass(resolved, Enum):
-                    return [m.value for m in resolved]
+                    return tuple(m.value for m in resolved)
         elif inspect.isclass(hint) and issubclass(hint, Enum):
-            return [m.value for m in hint]
-        return []
+            return tuple(m.value for m in hint)
+        return ()
 
     @staticmethod
     def _element_type_name(f: dataclasses.Field) -> str:  # type: ignore[type-arg]
@@ -5,6 +5,7 @@ from __future__ import annotations
 import pytest
 import yaml
 
+from akn_profiler.models import cascade
 from akn_profiler.models.cascade import collapse_element, expand_element
 from akn_profiler.xsd.schema_loader import AknSchema
 
@@ -14,6 +15,13 @@ def schema() -> AknSchema:
     return AknSchema.load()
 
 
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML built without libyaml")
+def test_uses_libyaml_backend() -> None:
+    """Cascade parse/dump must run on the C backend when it is available."""
+    assert issubclass(cascade._ProfileDumper, yaml.CSafeDumper)
+    assert cascade._SafeLoader is yaml.CSafeLoader
+
+
 MINIMAL_PROFILE = """\
 profile:
   name: "Test"
@@ -60,11 +68,40 @@ class TestExpandElement:
         assert "name" in act_elem["attributes"]
         assert "contains" in act_elem["attributes"]
 
+    def test_expand_writes_enum_values_as_plain_list(self, schema: AknSchema) -> None:
+        result = expand_element(MINIMAL_PROFILE, "act", schema)
+        attrs = yaml.safe_load(result)["profile"]["elements"]["act"]["attributes"]
+        info = schema.get_element_info("act")
+        assert info is not None
+        assert attrs["contains"]["values"] == list(info.attributes_by_name["contains"].enum_values)
+        assert "&id" not in result and "!!python" not in result
+
     def test_expand_is_idempotent(self, schema: AknSchema) -> None:
         first = expand_element(MINIMAL_PROFILE, "act", schema)
         second = expand_element(first, "act", schema)
         assert yaml.safe_load(first) == yaml.safe_load(second)
 
+    def test_expand_returns_input_when_nothing_changes(self, schema: AknSchema) -> None:
+        """A no-op expand hands back the original text, formatting intact."""
+        first = expand_element(MINIMAL_PROFILE, "act", schema)
+        hand_edited = first.replace("\n\n", "\n") + "# trailing comment\n"
+        assert expand_element(hand_edited, "act", schema) == hand_edited
+
+    def test_expand_of_complete_chain_is_noop(self, schema: AknSchema) -> None:
+        """Re-expanding an already materialised chain hands back the input."""
+        first = expand_element(MINIMAL_PROFILE, "act", schema)
+        for name in ("act", "meta", "identification", "FRBRWork"):
+            assert expand_element(first, name, schema) is first
+
+    def test_expand_repeated_call_is_stable(self, schema: AknSchema) -> None:
+        """Repeated calls on the same text must not see earlier mutations."""
+        first = expand_element(MINIMAL_PROFILE, "act", schema)
+        other = expand_element(MINIMAL_PROFILE, "judgment", schema)
+        again = expand_element(MINIMAL_PROFILE, "act", schema)
+        assert first == again
+        assert "judgment" not in yaml.safe_load(again)["profile"]["elements"]
+        assert "act" not in yaml.safe_load(other)["profile"]["elements"]
+
     def test_expand_includes_meta_children(self, schema: AknSchema) -> None:
         result = expand_element(MINIMAL_PROFILE, "meta", schema)
         data = yaml.safe_load(result)
@@ -122,6 +159,69 @@ profile:
         if isinstance(act_elem, dict) and "children" in act_elem:
             assert "meta" not in act_elem["children"]
 
+    def test_collapse_removes_child_shared_by_removed_parents(self, schema: AknSchema) -> None:
+        shared = """\
+profile:
+  name: "Test"
+  elements:
+    akomaNtoso:
+    act:
+      children:
+        preface:
+        body:
+    preface:
+      children:
+        p:
+    body:
+      children:
+        p:
+    p:
+"""
+        result = collapse_element(shared, "act", schema)
+        elements = yaml.safe_load(result)["profile"]["elements"]
+        assert "p" not in elements
+        assert "akomaNtoso" in elements
+
+    def test_collapse_handles_reference_cycles(self, schema: AknSchema) -> None:
+        cyclic = """\
+profile:
+  name: "Test"
+  elements:
+    akomaNtoso:
+      children:
+        act:
+    act:
+      children:
+        body:
+    body:
+      children:
+        act:
+        p:
+    p:
+"""
+        result = collapse_element(cyclic, "body", schema)
+        elements = yaml.safe_load(result)["profile"]["elements"]
+        # act is still referenced by akomaNtoso; p was only reachable via body
+        assert "act" in elements
+        assert "p" not in elements
+        assert "body" not in elements
+
+    def test_collapse_keeps_child_shared_with_survivor(self, schema: AknSchema) -> None:
+        result = collapse_element(self.FULL, "identification", schema)
+        result = collapse_element(result, "meta", schema)
+        elements = yaml.safe_load(result)["profile"]["elements"]
+        assert "body" in elements
+
+    def test_collapse_absent_element_returns_input(self, schema: AknSchema) -> None:
+        assert collapse_element(self.FULL, "article", schema) == self.FULL
+
+    def test_collapse_leaves_unrelated_entries_alone(self, schema: AknSchema) -> None:
+        text = self.FULL + "      children: {}\n"  # empty mapping under body
+        result = collapse_element(text, "identification", schema)
+        elements = yaml.safe_load(result)["profile"]["elements"]
+        assert elements["body"] == {"children": {}}
+        assert "children" not in elements["meta"]
+
     def test_collapse_removes_element_and_cleans_parent(self, schema: AknSchema) -> None:
         result = collapse_element(self.FULL, "identification", schema)
         data = yaml.safe_load(result)
@@ -167,3 +267,51 @@ profile:
             if isinstance(children, dict):
                 assert "choice" in children
                 assert "article" not in children
+
+
+class TestBlankLines:
+    """_insert_blank_lines spaces out sections and element entries."""
+
+    def test_golden_layout(self) -> None:
+        dumped = (
+            "profile:\n"
+            "  name: Test\n"
+            "  documentTypes:\n"
+            "  - act\n"
+            "  elements:\n"
+            "    akomaNtoso:\n"
+            "      children:\n"
+            "        act: 1..1\n"
+            "    act:\n"
+            "      attributes:\n"
+            "        name:\n"
+            "          required: true\n"
+            "    body: null\n"
+            "    meta:\n"
+        )
+        expected = (
+            "profile:\n"
+            "  name: Test\n"
+            "\n"
+            "  documentTypes:\n"
+            "  - act\n"
+            "\n"
+            "  elements:\n"
+            "    akomaNtoso:\n"
+            "      children:\n"
+            "        act: 1..1\n"
+            "\n"
+            "    act:\n"
+            "      attributes:\n"
+            "        name:\n"
+            "          required: true\n"
+            "\n"
+            "    body: null\n"
+            "\n"
+            "    meta:\n"
+        )
+        assert cascade._insert_blank_lines(dumped) == expected
+
+    def test_only_inside_elements_block(self) -> None:
+        text = "profile:\n  name: x\nother:\n    key: value\n"
+        assert cascade._insert_blank_lines(text) == text
@@ -21,6 +21,7 @@ from akn_profiler.server import (
     _build_cascade_add_edit,
     _build_child_remove_edit,
     _child_name_at_line,
+    _close_matches,
     _collect_orphaned_elements,
     _section_end,
 )
@@ -51,6 +52,41 @@ def _titles(source: str, cursor_line: int) -> list[str]:
     return [a.title for a in actions]
 
 
+@pytest.fixture()
+def validated_actions(monkeypatch: pytest.MonkeyPatch):
+    """Run *source* through validation, then through ``code_action``."""
+    from lsprotocol.types import (
+        CodeActionContext,
+        CodeActionParams,
+        Position,
+        Range,
+        TextDocumentIdentifier,
+        TextDocumentItem,
+    )
+    from pygls.workspace import Workspace
+
+    from akn_profiler.validation.engine import validate_profile
+
+    ws = Workspace(None)
+    monkeypatch.setattr(_srv.server.protocol, "_workspace", ws)
+    monkeypatch.setattr(_srv, "_last_code_actions", {})
+
+    def run(source: str) -> list[str]:
+        ws.put_text_document(
+            TextDocumentItem(uri=_FAKE_URI, language_id="yaml", version=1, text=source)
+        )
+        diagnostics = [_srv._error_to_diagnostic(e) for e in validate_profile(source, _schema)]
+        start = Position(line=0, character=0)
+        params = CodeActionParams(
+            text_document=TextDocumentIdentifier(uri=_FAKE_URI),
+            range=Range(start=start, end=start),
+            context=CodeActionContext(diagnostics=diagnostics),
+        )
+        return [a.title for a in _srv.code_action(params)]
+
+    return run
+
+
 # ------------------------------------------------------------------
 # _section_end helper
 # ------------------------------------------------------------------
@@ -153,6 +189,37 @@ profile:
         assert any("new" in t.lower() or "section" in t.lower() for t in child_titles)
 
 
+class TestManyElementsActions:
+    SOURCE = """\
+profile:
+  elements:
+    act:
+      children:
+        meta:
+    body:
+      profileNote: "b"
+    # between entries
+    chapter:
+      attributes:
+        eId:
+"""
+
+    @pytest.mark.parametrize(
+        ("cursor_line", "element"),
+        [(2, "act"), (4, "act"), (5, "body"), (6, "body"), (8, "chapter"), (10, "chapter")],
+    )
+    def test_actions_target_the_enclosing_element(self, cursor_line: int, element: str):
+        titles = _titles(self.SOURCE, cursor_line)
+        assert titles
+        assert all(f"'{element}'" in t for t in titles if "'" in t and "profile" not in t)
+
+    def test_comment_between_entries_belongs_to_no_element(self):
+        assert _titles(self.SOURCE, 7) == []
+
+    def test_past_last_element_offers_add_element(self):
+        assert _titles(self.SOURCE + "\n", 11) == ["Add element to profile"]
+
+
 # ------------------------------------------------------------------
 # Element with existing children: block
 # ------------------------------------------------------------------
@@ -523,6 +590,34 @@ class TestBuildChildRemoveEdit:
         edit = _build_child_remove_edit(_FAKE_URI, self.SOURCE, "act", "notAChild")
         assert edit is None
 
+    def test_referenced_child_is_removed_in_place(self):
+        source = textwrap.dedent("""\
+            profile:
+              elements:
+                act:
+                  # keep this comment
+                  children:
+                    meta:
+                    body:
+                bill:
+                  children:
+                    meta:
+                meta:
+        """)
+        edit = _build_child_remove_edit(_FAKE_URI, source, "act", "meta")
+        assert edit is not None
+        (text_edit,) = edit.changes[_FAKE_URI]
+        assert text_edit.new_text == ""
+        assert (text_edit.range.start.line, text_edit.range.end.line) == (5, 6)
+
+    def test_key_line_follows_nested_keys(self):
+        from akn_profiler.server import _key_line
+
+        lines = self.SOURCE.splitlines()
+        assert _key_line(lines, ("profile", "elements", "act", "children", "body")) == 6
+        assert _key_line(lines, ("profile", "elements", "body")) == 8
+        assert _key_line(lines, ("profile", "elements", "act", "body")) is None
+
 
 class TestCollectOrphanedElements:
     """_collect_orphaned_elements should walk descendants."""
@@ -541,6 +636,19 @@ class TestCollectOrphanedElements:
         # body is referenced by act (not being removed), so NOT orphaned
         assert "body" not in orphaned
 
+    def test_shared_descendants(self):
+        elements = {
+            "act": {"children": {"meta": None, "body": None}},
+            "meta": {"children": {"identification": None, "lifecycle": None}},
+            "identification": {"children": {"FRBRWork": None}},
+            "lifecycle": {"children": {"FRBRWork": None}},
+            "FRBRWork": {},
+            "body": {"children": {"lifecycle": None}},
+        }
+        orphaned = _collect_orphaned_elements("meta", elements)
+        # lifecycle is still used by body; FRBRWork by lifecycle
+        assert orphaned == {"meta", "identification"}
+
 
 class TestChildNameAtLine:
     """_child_name_at_line extracts the child element name."""
@@ -643,3 +751,293 @@ class TestFindElementContext:
         """)
         # line 3 = "      children:" — structural, should NOT return
         assert _find_element_context(source, 3) != "children"
+
+
+class TestCloseMatches:
+    """_close_matches ranks 'did you mean' suggestions."""
+
+    def test_typo_suggests_element(self) -> None:
+        assert _close_matches("artcle", _schema.element_names(), 3, 0.5)[0] == "article"
+
+    def test_limit_and_cutoff(self) -> None:
+        assert len(_close_matches("sect", _schema.element_names(), 2, 0.5)) <= 2
+        assert _close_matches("zzzzzz", _schema.element_names(), 3, 0.5) == []
+
+    @pytest.mark.parametrize("cutoff", [0.4, 0.5, 0.8])
+    @pytest.mark.parametrize("word", ["artcle", "p", "xct", "akomaNtosoo", "longTitleeeeeeeeee"])
+    def test_length_prefilter_keeps_results(self, word: str, cutoff: float) -> None:
+        import difflib
+
+        names = list(_schema.element_names())
+        if _srv._fuzz_process is None:
+            expected = difflib.get_close_matches(word, names, n=3, cutoff=cutoff)
+        else:
+            expected = [
+                m
+                for m, _s, _i in _srv._fuzz_process.extract(
+                    word,
+                    names,
+                    scorer=_srv._fuzz.ratio,
+                    processor=None,
+                    limit=3,
+                    score_cutoff=cutoff * 100,
+                )
+            ]
+        assert _close_matches(word, names, 3, cutoff) == expected
+
+    def test_prefilter_from_real_diagnostics(
+        self, validated_actions, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Only length-feasible names reach the matcher; hopeless typos skip it."""
+        pools: list[list[str]] = []
+        get_close_matches = _srv.difflib.get_close_matches
+
+        def recording(word, candidates, **kwargs):
+            pools.append(list(candidates))
+            return get_close_matches(word, candidates, **kwargs)
+
+        monkeypatch.setattr(_srv, "_fuzz_process", None)
+        monkeypatch.setattr(_srv.difflib, "get_close_matches", recording)
+        titles = validated_actions(
+            textwrap.dedent(f"""\
+                profile:
+                  elements:
+                    akomaNtoso:
+                    artcle:
+                    {"a" * 120}:
+                """)
+        )
+        assert "Replace with 'article'" in titles
+        (pool,) = pools
+        assert "article" in pool
+        assert len(pool) < len(_schema.element_names())
+        # 2 * 6 / (6 + n) >= 0.5 needs n <= 18
+        assert all(len(name) <= 19 for name in pool)
+
+    def test_difflib_fallback_uses_prefilter(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(_srv, "_fuzz_process", None)
+        assert _close_matches("artcle", _schema.element_names(), 3, 0.5)[0] == "article"
+        assert _close_matches("a" * 40, _schema.element_names(), 3, 0.5) == []
+
+
+class TestExtractNameFromMsg:
+    """_extract_name_from_msg pulls the first quoted name out of a message."""
+
+    def test_first_quoted_name(self) -> None:
+        from akn_profiler.server import _extract_name_from_msg
+
+        msg = "'artcle' is not a valid AKN element; did you mean 'article'?"
+        assert _extract_name_from_msg(msg) == "artcle"
+
+    def test_no_quoted_name(self) -> None:
+        from akn_profiler.server import _extract_name_from_msg
+
+        assert _extract_name_from_msg("Missing top-level 'profile key") is None
+
+
+class TestSourceLines:
+    """_source_lines splits each document text once."""
+
+    def test_matches_splitlines_and_is_shared(self) -> None:
+        from akn_profiler.server import _source_lines
+
+        source = "profile:\r\n  elements:\n    act:\n"
+        lines = _source_lines(source)
+        assert list(lines) == source.splitlines()
+        assert _source_lines(source) is lines
+
+
+class TestCodeActionCache:
+    """code_action reuses its response for a repeated identical request."""
+
+    @pytest.fixture()
+    def request_for(self, monkeypatch: pytest.MonkeyPatch):
+        from lsprotocol.types import (
+            CodeActionContext,
+            CodeActionParams,
+            Position,
+            Range,
+            TextDocumentIdentifier,
+            TextDocumentItem,
+        )
+        from pygls.workspace import Workspace
+
+        ws = Workspace(None)
+        monkeypatch.setattr(_srv.server.protocol, "_workspace", ws)
+        monkeypatch.setattr(_srv, "_last_code_actions", {})
+        built: list[int] = []
+        build = _srv._build_code_actions
+
+        def counting_build(params, doc):
+            built.append(params.range.start.line)
+            return build(params, doc)
+
+        monkeypatch.setattr(_srv, "_build_code_actions", counting_build)
+
+        def request(source: str, version: int, line: int) -> CodeActionParams:
+            ws.put_text_document(
+                TextDocumentItem(uri=_FAKE_URI, language_id="yaml", version=version, text=source)
+            )
+            pos = Position(line=line, character=0)
+            return CodeActionParams(
+                text_document=TextDocumentIdentifier(uri=_FAKE_URI),
+                range=Range(start=pos, end=pos),
+                context=CodeActionContext(diagnostics=[]),
+            )
+
+        request.built = built
+        return request
+
+    _SOURCE = "profile:\n  elements:\n    act:\n"
+
+    def test_repeated_request_is_served_from_cache(self, request_for) -> None:
+        first = _srv.code_action(request_for(self._SOURCE, 1, 2))
+        second = _srv.code_action(request_for(self._SOURCE, 1, 2))
+        assert [a.title for a in second] == [a.title for a in first]
+        assert request_for.built == [2]
+
+    def test_new_version_or_position_rebuilds(self, request_for) -> None:
+        _srv.code_action(request_for(self._SOURCE, 1, 2))
+        _srv.code_action(request_for(self._SOURCE, 1, 1))
+        _srv.code_action(request_for(self._SOURCE + "    body:\n", 2, 1))
+        assert request_for.built == [2, 1, 1]
+
+    def test_identity_config_change_rebuilds(
+        self, request_for, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from lsprotocol.types import CodeActionContext, DidChangeConfigurationParams
+
+        monkeypatch.setattr(_srv, "_auto_add_eid", True)
+        source = (
+            "profile:\n  documentTypes:\n    - act\n"
+            "  elements:\n    akomaNtoso:\n      children:\n        - act\n"
+        )
+        diagnostic = TestQuickFixes._diagnostic(
+            "strictness.undeclared-child-element", "'act' is listed as a child", 6
+        )
+
+        def define_text() -> str:
+            params = request_for(source, 1, 6)
+            params.context = CodeActionContext(diagnostics=[diagnostic])
+            (action,) = [a for a in _srv.code_action(params) if a.title.startswith("Define")]
+            return action.edit.changes[_FAKE_URI][0].new_text
+
+        assert "eId" in define_text()
+        _srv.did_change_configuration(
+            DidChangeConfigurationParams(
+                settings={"aknProfiler": {"identity": {"autoAddEId": False}}}
+            )
+        )
+        assert "eId" not in define_text()
+        assert len(request_for.built) == 2
+
+
+class TestQuickFixes:
+    """Diagnostic quick-fixes are dispatched by rule_id."""
+
+    @staticmethod
+    def _diagnostic(code: str, message: str, line: int = 0):
+        from lsprotocol.types import Diagnostic, Position, Range
+
+        pos = Position(line=line, character=0)
+        return Diagnostic(
+            range=Range(start=pos, end=pos), message=message, code=code, source="akn-profiler"
+        )
+
+    @pytest.mark.parametrize("rule_id", ["parse.not-a-mapping", "parse.missing-profile-key"])
+    def test_scaffold_for_missing_profile(self, rule_id: str) -> None:
+        from akn_profiler.server import _PROFILE_SCAFFOLD_TEXT, _QUICK_FIXES
+
+        diagnostic = self._diagnostic(rule_id, "no profile")
+        (action,) = _QUICK_FIXES[rule_id](_FAKE_URI, "", diagnostic)
+        assert action.edit.changes[_FAKE_URI][0].new_text == _PROFILE_SCAFFOLD_TEXT
+        assert "  documentTypes:\n\n  elements:\n" in _PROFILE_SCAFFOLD_TEXT
+
+    _TYPO_PROFILE = textwrap.dedent("""\
+        profile:
+          name: "Typos"
+          documentTypes:
+            - actt
+          elements:
+            akomaNtoso:
+            artcle:
+            section:
+              attributes:
+                eIdd:
+        """)
+
+    def test_unknown_names_from_validation_suggest_replacements(self, validated_actions) -> None:
+        titles = validated_actions(self._TYPO_PROFILE)
+        assert "Replace with 'act'" in titles
+        assert "Replace with 'article'" in titles
+        assert "Replace with 'eId'" in titles
+
+    @pytest.mark.parametrize("backend", ["rapidfuzz", "difflib"])
+    def test_matcher_backends_give_the_same_suggestions(
+        self, backend: str, validated_actions, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        if backend == "rapidfuzz":
+            pytest.importorskip("rapidfuzz")
+            assert _srv._fuzz_process is not None
+        else:
+            monkeypatch.setattr(_srv, "_fuzz_process", None)
+        titles = validated_actions(self._TYPO_PROFILE)
+        assert {"Replace with 'act'", "Replace with 'article'", "Replace with 'eId'"} <= set(titles)
+
+    def test_rules_without_quick_fix_are_not_dispatched(self) -> None:
+        from akn_profiler.server import _QUICK_FIXES
+
+        assert "choice.required-group-empty" not in _QUICK_FIXES
+        assert "choice.incomplete-branches" not in _QUICK_FIXES
+
+
+class TestReplaceWordEdit:
+    """_replace_word_edit replaces the whole word, not a substring of another."""
+
+    def test_skips_longer_names_containing_the_word(self) -> None:
+        from akn_profiler.server import _replace_word_edit
+
+        source = "    children: [bodyRef, foo-body, body]\n"
+        edit = _replace_word_edit(_FAKE_URI, source, 0, "body", "mainBody")
+        (text_edit,) = edit.changes[_FAKE_URI]
+        assert text_edit.range.start.character == source.index("body]")
+        assert text_edit.range.end.character == source.index("]")
+
+    def test_missing_word_or_line(self) -> None:
+        from akn_profiler.server import _replace_word_edit
+
+        assert _replace_word_edit(_FAKE_URI, "    bodyRef:\n", 0, "body", "x") is None
+        assert _replace_word_edit(_FAKE_URI, "    body:\n", 5, "body", "x") is None
+
+
+class TestSectionLayout:
+    """'Add …' actions only scan and act inside their sections."""
+
+    _SOURCE = textwrap.dedent("""\
+        profile:
+          name: "Test"
+          documentTypes:
+            - act
+          elements:
+            act:
+              children:
+                - body
+        """)
+
+    def test_layout_is_computed_once_per_text(self) -> None:
+        from akn_profiler.server import _section_layout
+
+        layout = _section_layout(self._SOURCE)
+        assert _section_layout(self._SOURCE) is layout
+        assert (layout.doc_types_line, layout.doc_types_end) == (2, 3)
+        assert (layout.elements_line, layout.elements_end) == (4, 7)
+        assert layout.element_entries == ((5, 7, "act"),)
+
+    def test_cursor_outside_sections_has_no_actions(self) -> None:
+        assert _titles(self._SOURCE, 0) == []
+        assert _titles(self._SOURCE, 1) == []
+
+    def test_cursor_inside_sections_still_has_actions(self) -> None:
+        assert _titles(self._SOURCE, 3) == ["Add document type"]
+        assert "Add element to profile" in _titles(self._SOURCE, 4)
+        assert "Add element to profile" in _titles(self._SOURCE, 8)
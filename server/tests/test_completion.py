@@ -7,6 +7,15 @@ resolver integration — they do **not** start a real LSP server.
 from __future__ import annotations
 
 import pytest
+from lsprotocol.types import (
+    CompletionItem,
+    CompletionList,
+    CompletionParams,
+    Position,
+    TextDocumentIdentifier,
+    TextDocumentItem,
+)
+from pygls.workspace import Workspace
 
 from akn_profiler.validation.yaml_context import Scope, resolve_context
 from akn_profiler.xsd.schema_loader import AknSchema
@@ -138,7 +147,7 @@ class TestProfileNoteCompletion:
         assert ctx.scope == Scope.ELEMENT_BODY
         # profileNote should be in the existing_keys exclusion path,
         # and offered by the completion handler since it's in
-        # _ELEMENT_BODY_KEYS.
+        # _ELEMENT_BODY_SNIPPETS.
         assert "profileNote" not in ctx.existing_keys
 
     DOC_WITH_NOTE = (
@@ -153,3 +162,264 @@ class TestProfileNoteCompletion:
         ctx = resolve_context(self.DOC_WITH_NOTE, 4, 6)
         assert ctx.scope == Scope.ELEMENT_BODY
         assert "profileNote" in ctx.existing_keys
+
+
+class TestCompletionHandler:
+    """Run the completion handler against an in-memory workspace."""
+
+    URI = "file:///tmp/test.akn.yaml"
+
+    @pytest.fixture()
+    def complete(self, schema: AknSchema, monkeypatch: pytest.MonkeyPatch):
+        import akn_profiler.server as srv
+
+        workspace = Workspace(None)
+        monkeypatch.setattr(srv, "akn_schema", schema)
+        monkeypatch.setattr(srv.server.protocol, "_workspace", workspace)
+
+        def run(text: str, line: int, character: int) -> CompletionList:
+            workspace.put_text_document(
+                TextDocumentItem(uri=self.URI, language_id="yaml", version=1, text=text)
+            )
+            result = srv.completion(
+                CompletionParams(
+                    text_document=TextDocumentIdentifier(uri=self.URI),
+                    position=Position(line=line, character=character),
+                )
+            )
+            return result
+
+        return run
+
+    def test_every_scope_has_a_completer(self) -> None:
+        import akn_profiler.server as srv
+
+        assert set(srv._SCOPE_COMPLETERS) == set(Scope)
+
+    def test_profile_keys_in_order_minus_existing(self, complete) -> None:
+        labels = [i.label for i in complete('profile:\n  name: "x"\n  \n', 2, 2).items]
+        assert labels == ["version", "description", "documentTypes", "elements"]
+
+    @pytest.mark.parametrize(
+        ("line_text", "character"),
+        [
+            ("  description: A profile for ", 29),
+            ("  # elements to add ", 20),
+            ('  name: "Draft ', 15),
+            ("  version: 1", 12),
+        ],
+    )
+    def test_nothing_offered_in_free_text(self, complete, line_text: str, character: int) -> None:
+        result = complete(f"profile:\n{line_text}\n", 1, character)
+        assert result.items == []
+        assert not result.is_incomplete
+
+    def test_key_before_free_text_value_still_completes(self, complete) -> None:
+        labels = [i.label for i in complete('profile:\n  name: "x"\n  ve\n', 2, 4).items]
+        assert "version" in labels
+
+    def test_element_body_keys(self, complete) -> None:
+        labels = [i.label for i in complete(TestProfileNoteCompletion.DOC_WITH_NOTE, 4, 6).items]
+        assert labels == ["attributes", "children", "structure"]
+
+    def test_element_body_snippets(self, complete) -> None:
+        items = complete(TestProfileNoteCompletion.DOC_WITH_ELEMENT, 3, 6).items
+        snippets = {i.label: i.insert_text for i in items}
+        assert snippets["profileNote"] == 'profileNote: "$1"\n'
+        assert snippets["structure"] == "structure:\n  - $1\n"
+
+    def test_element_names_skip_existing_entries(self, complete) -> None:
+        result = complete("profile:\n  elements:\n    act:\n    ac\n", 3, 6)
+        labels = [i.label for i in result.items]
+        assert "act" not in labels
+        assert "attachment" in labels
+
+    def test_element_names_capped_and_incomplete(self, complete, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        result = complete("profile:\n  elements:\n    act:\n    \n", 3, 4)
+        assert len(schema.element_names()) > srv._COMPLETION_LIMIT
+        assert len(result.items) == srv._COMPLETION_LIMIT
+        assert result.is_incomplete
+
+    def test_candidates_past_the_cap_are_not_built(
+        self, complete, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import itertools
+
+        import akn_profiler.server as srv
+
+        produced = itertools.count()
+
+        def endless(schema, ctx, excluded, matches):
+            while True:
+                yield CompletionItem(label=f"item{next(produced)}")
+
+        monkeypatch.setitem(srv._SCOPE_COMPLETERS, Scope.ELEMENTS, endless)
+        result = complete("profile:\n  elements:\n    \n", 2, 4)
+        assert len(result.items) == srv._COMPLETION_LIMIT
+        assert result.is_incomplete
+        assert next(produced) == srv._COMPLETION_LIMIT + 1
+
+    def test_typed_prefix_filters_children(self, complete) -> None:
+        text = "profile:\n  elements:\n    chapter:\n      children:\n        subch\n"
+        result = complete(text, 4, 13)
+        labels = [i.label for i in result.items]
+        assert "subchapter" in labels
+        assert "num" not in labels
+        assert result.is_incomplete
+
+    @pytest.mark.parametrize(
+        ("typed", "label", "expected"),
+        [
+            ("", "section", True),
+            ("sec", "section", True),
+            ("SbCh", "subchapter", True),
+            ("scn", "section", True),
+            ("ces", "section", False),
+            ("a.b", "aXb", False),
+            ("sections", "section", False),
+        ],
+    )
+    def test_typed_matcher_is_subsequence(self, typed: str, label: str, expected: bool) -> None:
+        import akn_profiler.server as srv
+
+        assert bool(srv._typed_matcher(typed)(label)) is expected
+
+    CHOICE_DOC = "profile:\n  elements:\n    chapter:\n      children:\n        choice:\n%s"
+
+    def test_first_choice_branch_chains_next_suggestion(self, complete) -> None:
+        result = complete(self.CHOICE_DOC % "          \n", 5, 10)
+        assert result.items
+        assert all(i.command is not None for i in result.items)
+
+    def test_later_choice_branches_do_not_chain(self, complete) -> None:
+        text = self.CHOICE_DOC % "          section:\n          \n"
+        result = complete(text, 6, 10)
+        labels = [i.label for i in result.items]
+        assert "section" not in labels
+        assert all(i.command is None for i in result.items)
+
+    def test_unfiltered_scope_is_complete(self, complete) -> None:
+        result = complete('profile:\n  name: "x"\n  ve\n', 2, 4)
+        assert not result.is_incomplete
+
+    def test_children_without_docs_share_markup(self, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        assert srv._markdown("") is srv._markdown("")
+        by_value: dict = {}
+        for item in srv._child_items(schema, "act"):
+            doc = item.documentation
+            assert by_value.setdefault(doc.value, doc) is doc
+
+    def test_child_items_built_once_per_parent(self, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        items = srv._child_items(schema, "act")
+        assert srv._child_items(schema, "act") is items
+        assert [i.label for i in items] == list(schema.get_children("act"))
+        meta = next(i for i in items if i.label == "meta")
+        assert meta.sort_text.startswith("0_")
+        assert meta.insert_text == "meta: 1..1"
+        assert srv._child_items(schema, "notAnElement") == ()
+
+    def test_element_name_items_built_once_per_schema(self, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        new_entries, renames = srv._element_name_items(schema)
+        assert srv._element_name_items(schema)[0] is new_entries
+        assert [i.label for i in renames] == list(schema.element_names())
+        assert new_entries[0].insert_text == f"{new_entries[0].label}:\n"
+
+    def test_context_is_memoised_per_text_and_position(self) -> None:
+        import akn_profiler.server as srv
+
+        source = 'profile:\n  name: "x"\n  \n'
+        ctx = srv._context_at(source, 2, 2)
+        assert ctx.scope == Scope.PROFILE
+        assert srv._context_at(source, 2, 2) is ctx
+        assert srv._context_at(source + "\n", 2, 2) is not ctx
+
+    def test_static_items_survive_repeated_requests(self, complete) -> None:
+        first = [i.label for i in complete("", 0, 0).items]
+        assert [i.label for i in complete("", 0, 0).items] == first == ["profile"]
+
+
+class TestCompletionResolve:
+    """Docs are left off element/attribute items and added on resolve."""
+
+    def test_element_item_resolves_to_element_doc(self, schema: AknSchema, monkeypatch) -> None:
+        import akn_profiler.server as srv
+
+        monkeypatch.setattr(srv, "akn_schema", schema)
+        cached = next(i for i in srv._element_name_items(schema)[0] if i.label == "act")
+        assert cached.documentation is None
+        # The client sends back its own copy of the item
+        item = CompletionItem(label="act", data=dict(cached.data))
+        resolved = srv.completion_item_resolve(item)
+        assert resolved.documentation.value == srv._element_doc_for(schema, "act")
+
+    def test_attribute_item_resolves_to_attribute_doc(self, schema: AknSchema, monkeypatch) -> None:
+        import akn_profiler.server as srv
+
+        monkeypatch.setattr(srv, "akn_schema", schema)
+        attr = schema.get_element_info("act").attributes_by_name["name"]
+        item = CompletionItem(label="name", data=srv._attribute_resolve_data("act", "name"))
+        resolved = srv.completion_item_resolve(item)
+        assert resolved.documentation.value == srv._attribute_doc(attr)
+
+    def test_item_without_data_is_returned_unchanged(self, schema: AknSchema, monkeypatch) -> None:
+        import akn_profiler.server as srv
+
+        monkeypatch.setattr(srv, "akn_schema", schema)
+        item = CompletionItem(label="required")
+        assert srv.completion_item_resolve(item) is item
+        assert item.documentation is None
+
+
+class TestDocStrings:
+    """Element and attribute docs are built once per schema."""
+
+    def test_element_doc_is_memoised(self, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        doc = srv._element_doc_for(schema, "act")
+        assert "**Required children:** meta" in doc
+        assert srv._element_doc_for(schema, "act") is doc
+
+    def test_attribute_doc_is_memoised(self, schema: AknSchema) -> None:
+        import akn_profiler.server as srv
+
+        attr = schema.get_attributes("act")[0]
+        doc = srv._attribute_doc(attr)
+        assert f"**Type:** `{attr.type_hint}`" in doc
+        assert srv._attribute_doc(attr) is doc
+
+
+class TestWordAt:
+    """_word_at finds the word under the cursor."""
+
+    def test_word_in_middle_of_line(self) -> None:
+        from akn_profiler.server import _word_at
+
+        source = "profile:\n  elements:\n    doc-Type_2: x\n"
+        assert _word_at(source, 2, 7) == "doc-Type_2"
+        assert _word_at(source, 1, 2) == "elements"
+
+    def test_out_of_range_and_separators(self) -> None:
+        from akn_profiler.server import _word_at
+
+        source = "a: b\r\nccc\n"
+        assert _word_at(source, 0, 1) == "a"
+        assert _word_at(source, 0, 2) is None  # the space after ':'
+        assert _word_at(source, 1, 3) is None  # past end of line
+        assert _word_at(source, 2, 0) is None  # past last line
+
+    def test_word_does_not_cross_line_boundaries(self) -> None:
+        from akn_profiler.server import _word_at
+
+        source = "alpha\nbeta gamma\n"
+        assert _word_at(source, 1, 0) == "beta"
+        assert _word_at(source, 1, 6) == "gamma"
+        assert _word_at(source, 1, 9) == "gamma"
@@ -104,13 +104,13 @@ class TestAllDocumentTypes:
     """The generator should work for every AKN document type."""
 
     @pytest.fixture(scope="class")
-    def doc_types(self, schema: AknSchema) -> list[str]:
+    def doc_types(self, schema: AknSchema) -> tuple[str, ...]:
         return schema.get_children("akomaNtoso")
 
-    def test_at_least_one_doc_type(self, doc_types: list[str]) -> None:
+    def test_at_least_one_doc_type(self, doc_types: tuple[str, ...]) -> None:
         assert len(doc_types) >= 1
 
-    def test_generate_all_doc_types(self, schema: AknSchema, doc_types: list[str]) -> None:
+    def test_generate_all_doc_types(self, schema: AknSchema, doc_types: tuple[str, ...]) -> None:
         for dt in doc_types:
             profile = generate_profile(schema, dt)
             assert dt in profile.documentTypes
@@ -187,6 +187,11 @@ class TestGenerateYaml:
         assert data["profile"]["name"]
         assert data["profile"]["version"]
 
+    def test_repeated_call_is_memoised(self, schema: AknSchema) -> None:
+        first = generate_yaml(schema, "bill", comments=True)
+        assert generate_yaml(schema, "bill", comments=True) is first
+        assert generate_yaml(schema, "bill", comments=False) is not first
+
 
 # ------------------------------------------------------------------
 # choiceCardinality in generated output
@@ -0,0 +1,146 @@
+"""Tests for publishing validation diagnostics to the client."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from lsprotocol.types import (
+    DiagnosticSeverity,
+    DidChangeTextDocumentParams,
+    DidCloseTextDocumentParams,
+    TextDocumentIdentifier,
+    TextDocumentItem,
+    VersionedTextDocumentIdentifier,
+)
+from pygls.workspace import Workspace
+
+import akn_profiler.server as srv
+from akn_profiler.validation.errors import Severity, ValidationError
+from akn_profiler.xsd.schema_loader import AknSchema
+
+URI = "file:///tmp/test.akn.yaml"
+
+BROKEN = """\
+profile:
+  name: "Test"
+  documentTypes:
+    - notADocType
+  elements:
+    akomaNtoso:
+"""
+
+
+@pytest.fixture()
+def published(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Capture every publishDiagnostics notification sent by the server."""
+    sent: list = []
+    monkeypatch.setattr(srv, "akn_schema", AknSchema.load())
+    monkeypatch.setattr(srv, "_last_published", {})
+    monkeypatch.setattr(srv.server, "text_document_publish_diagnostics", sent.append)
+    return sent
+
+
+@pytest.mark.parametrize(
+    ("severity", "expected"),
+    [
+        (Severity.ERROR, DiagnosticSeverity.Error),
+        (Severity.WARNING, DiagnosticSeverity.Warning),
+        (Severity.INFO, DiagnosticSeverity.Information),
+    ],
+)
+def test_error_to_diagnostic_maps_severity(
+    severity: Severity, expected: DiagnosticSeverity
+) -> None:
+    error = ValidationError(rule_id="x.y", path="", message="m", severity=severity, line=3)
+    diagnostic = srv._error_to_diagnostic(error)
+    assert diagnostic.severity == expected
+    assert diagnostic.range.start.line == 2
+
+
+class TestPublishDiagnostics:
+    """_validate_and_publish only sends diagnostics that changed."""
+
+    def test_first_publish_is_sent(self, published: list) -> None:
+        srv._validate_and_publish(URI, BROKEN)
+        assert len(published) == 1
+        assert published[0].uri == URI
+        assert published[0].diagnostics
+
+    def test_unchanged_diagnostics_are_not_resent(self, published: list) -> None:
+        srv._validate_and_publish(URI, BROKEN)
+        # A comment edit changes the text but not the findings
+        srv._validate_and_publish(URI, BROKEN + "# note\n")
+        assert len(published) == 1
+
+    def test_changed_diagnostics_are_sent(self, published: list) -> None:
+        srv._validate_and_publish(URI, BROKEN)
+        srv._validate_and_publish(URI, BROKEN.replace("notADocType", "act"))
+        assert len(published) == 2
+
+    def test_documents_are_tracked_separately(self, published: list) -> None:
+        srv._validate_and_publish(URI, BROKEN)
+        srv._validate_and_publish(URI + ".other", BROKEN)
+        assert len(published) == 2
+
+    def test_close_resets_tracking(self, published: list) -> None:
+        srv._validate_and_publish(URI, BROKEN)
+        srv.did_close(DidCloseTextDocumentParams(text_document=TextDocumentIdentifier(uri=URI)))
+        assert published[-1].diagnostics == []
+        srv._validate_and_publish(URI, BROKEN)
+        assert len(published) == 3
+        assert published[-1].diagnostics
+
+
+def _change(version: int) -> DidChangeTextDocumentParams:
+    return DidChangeTextDocumentParams(
+        text_document=VersionedTextDocumentIdentifier(uri=URI, version=version),
+        content_changes=[],
+    )
+
+
+class TestDebouncedValidation:
+    """did_change coalesces bursts of edits into one validation."""
+
+    @pytest.fixture()
+    def workspace(self, monkeypatch: pytest.MonkeyPatch) -> Workspace:
+        ws = Workspace(None)
+        monkeypatch.setattr(srv.server.protocol, "_workspace", ws)
+        monkeypatch.setattr(srv, "_pending_validation", {})
+        return ws
+
+    def _set_text(self, ws: Workspace, text: str, version: int) -> None:
+        ws.put_text_document(
+            TextDocumentItem(uri=URI, language_id="yaml", version=version, text=text)
+        )
+
+    def test_burst_is_validated_once_with_final_text(
+        self, published: list, workspace: Workspace
+    ) -> None:
+        async def type_burst() -> None:
+            for version, text in enumerate((BROKEN, BROKEN + "#", BROKEN + "# x\n")):
+                self._set_text(workspace, text, version)
+                srv.did_change(_change(version))
+            assert published == []
+            await asyncio.sleep(srv._VALIDATION_DELAY * 3)
+
+        asyncio.run(type_burst())
+        assert len(published) == 1
+        assert srv._pending_validation == {}
+
+    def test_close_cancels_pending_validation(self, published: list, workspace: Workspace) -> None:
+        async def edit_then_close() -> None:
+            self._set_text(workspace, BROKEN, 1)
+            srv.did_change(_change(1))
+            srv.did_close(DidCloseTextDocumentParams(text_document=TextDocumentIdentifier(uri=URI)))
+            await asyncio.sleep(srv._VALIDATION_DELAY * 3)
+
+        asyncio.run(edit_then_close())
+        assert [p.diagnostics for p in published] == [[]]
+
+    def test_without_event_loop_validates_immediately(
+        self, published: list, workspace: Workspace
+    ) -> None:
+        self._set_text(workspace, BROKEN, 1)
+        srv.did_change(_change(1))
+        assert len(published) == 1
@@ -434,6 +434,20 @@ class TestElementRestrictionChoice:
         assert r.exclusive_children["section"] == "1..*"
         assert r.exclusive_children["subchapter"] == "1..*"
 
+    def test_legacy_list_later_branch_wins_and_non_dicts_skipped(self) -> None:
+        """Duplicate keys across legacy branches keep the last value."""
+        r = ElementRestriction(
+            children={
+                "choice": [
+                    {"section": "1..*", "article": "0..*"},
+                    "stray",
+                    {"section": "1..1"},
+                ],
+            }
+        )
+        assert r.exclusive_children == {"section": "1..1", "article": "0..*"}
+        assert list(r.exclusive_children) == ["section", "article"]
+
     def test_no_choice_key(self) -> None:
         """Without choice: the exclusive_children stays empty."""
         r = ElementRestriction(children={"chapter": None})
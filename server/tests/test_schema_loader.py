@@ -15,6 +15,26 @@ class TestSchemaLoading:
     def test_loads_enums(self) -> None:
         assert len(_schema.all_enums()) > 10
 
+    def test_element_names_sorted_and_cached(self) -> None:
+        names = _schema.element_names()
+        assert list(names) == sorted(names)
+        assert _schema.element_names() is names
+
+    def test_document_types_match_root_children(self) -> None:
+        doc_types = _schema.document_types()
+        assert doc_types == _schema.get_children("akomaNtoso")
+        assert _schema.document_types() is doc_types
+
+    def test_accessors_return_shared_tuples(self) -> None:
+        assert _schema.get_children("act") is _schema.get_children("act")
+        assert _schema.get_attributes("act") is _schema.get_attributes("act")
+        assert isinstance(_schema.get_required_children("act"), tuple)
+
+    def test_get_element_infos_skips_unknown_names(self) -> None:
+        infos = _schema.get_element_infos(["act", "notAnElement", "bill"])
+        assert list(infos) == ["act", "bill"]
+        assert infos["act"] is _schema.get_element_info("act")
+
 
 class TestHasElement:
     """Verify element existence checks."""
@@ -53,7 +73,7 @@ class TestGetChildren:
         assert "body" in children
 
     def test_nonexistent_returns_empty(self) -> None:
-        assert _schema.get_children("foobar") == []
+        assert _schema.get_children("foobar") == ()
 
 
 class TestGetAttributes:
@@ -70,7 +90,7 @@ class TestGetAttributes:
         assert "eId" in attr_names
 
     def test_nonexistent_returns_empty(self) -> None:
-        assert _schema.get_attributes("foobar") == []
+        assert _schema.get_attributes("foobar") == ()
 
 
 class TestRequiredChildren:
@@ -174,6 +194,26 @@ class TestElementInfo:
     def test_nonexistent_returns_none(self) -> None:
         assert _schema.get_element_info("foobar") is None
 
+    def test_by_name_indexes_match_lists(self) -> None:
+        info = _schema.get_element_info("article")
+        assert info is not None
+        assert tuple(info.attributes_by_name.values()) == info.attributes
+        assert tuple(info.children_by_name.values()) == info.children
+        assert info.child_names == tuple(info.children_by_name)
+        assert info.attribute_names == tuple(info.attributes_by_name)
+        assert info.attributes_by_name["eId"].name == "eId"
+        names = [c.name for c in info.children]
+        assert set(info.optional_child_names) | info.required_child_names == set(names)
+        assert info.required_child_names.isdisjoint(info.optional_child_names)
+
+    def test_choice_group_labels_cover_branch_members(self) -> None:
+        info = _schema.get_element_info("chapter")
+        assert info is not None
+        for cg in info.choice_groups:
+            for member in cg.all_elements:
+                assert member in info.choice_group_labels
+        assert _schema.get_element_info("act").choice_group_labels == {}
+
 
 class TestChoiceGroups:
     """Verify XSD choice group extraction and attachment."""
@@ -208,6 +248,24 @@ class TestChoiceGroups:
         assert len(content_branches) >= 1
         assert len(hier_branches) >= 1
 
+    def test_exclusive_choice_precomputed(self) -> None:
+        """ElementInfo caches its first exclusive choice group."""
+        info = _schema.get_element_info("chapter")
+        assert info is not None
+        assert info.exclusive_choice is not None
+        assert info.exclusive_choice.exclusive
+        names = [c.name for c in info.exclusive_required_children]
+        assert all(c.required for c in info.exclusive_required_children)
+        assert all(n in info.exclusive_choice.all_elements for n in names)
+        body = _schema.get_element_info("body")
+        assert body is not None
+        assert body.exclusive_choice is None
+        assert body.exclusive_required_children == ()
+        assert body.plain_required_children == body.required_children
+        split = {c.name for c in info.plain_required_children}
+        split |= set(names)
+        assert split == {c.name for c in info.required_children}
+
     def test_body_not_exclusive(self) -> None:
         """body's choice group should NOT be exclusive (maxOccurs=unbounded)."""
         groups = _schema.get_choice_groups("body")
@@ -49,6 +49,11 @@ class TestProfileScope:
         assert "version" in ctx.existing_keys
         assert "description" in ctx.existing_keys
 
+    def test_key_sets_are_frozen(self) -> None:
+        ctx = resolve_context(self.PROFILE_DOC, 4, 2)
+        assert isinstance(ctx.existing_keys, frozenset)
+        assert ctx.cross_block_keys == frozenset()
+
 
 # ------------------------------------------------------------------
 # Document types
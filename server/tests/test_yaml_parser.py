@@ -1,5 +1,8 @@
 """Tests for the YAML parser and Pydantic profile models."""
 
+import pytest
+from pydantic import ValidationError as PydanticValidationError
+
 from akn_profiler.validation.yaml_parser import parse_profile
 
 
@@ -19,6 +22,16 @@ class TestYamlSyntax:
         assert profile is None
         assert any(e.rule_id == "parse.yaml-syntax" for e in errors)
 
+    def test_syntax_message_matches_pure_python_loader(self) -> None:
+        import yaml as pyyaml
+
+        text = "profile:\n  elements:\n    act:\n  - x\n"
+        with pytest.raises(pyyaml.YAMLError) as expected:
+            pyyaml.load(text, Loader=pyyaml.SafeLoader)
+        _, errors, _ = parse_profile(text)
+        assert errors[0].message == f"YAML syntax error: {expected.value}"
+        assert errors[0].line == 4
+
     def test_not_a_mapping(self) -> None:
         yaml = "- just\n- a\n- list\n"
         profile, errors, _ = parse_profile(yaml)
@@ -77,6 +90,14 @@ profile:
         assert profile.name == ""
         assert profile.elements == {}
 
+    def test_models_are_frozen(self) -> None:
+        profile, _, _ = parse_profile("profile:\n  elements:\n    act:\n")
+        assert profile is not None
+        with pytest.raises(PydanticValidationError):
+            profile.name = "changed"
+        with pytest.raises(PydanticValidationError):
+            profile.elements["act"].children = {}
+
 
 class TestLineIndex:
     """Line-number tracking from YAML source."""
@@ -99,6 +120,14 @@ profile:
         assert index.get("profile.documentTypes[0]") is not None
         assert index.get("profile.documentTypes[1]") is not None
 
+    def test_index_kept_when_construction_fails(self) -> None:
+        """Constructor errors happen after composing — the index survives."""
+        yaml = "profile:\n  name: test\n  bad: {[a]: 1}\n"
+        profile, errors, index = parse_profile(yaml)
+        assert profile is None
+        assert errors[0].rule_id == "parse.yaml-syntax"
+        assert index.get("profile.name") == 2
+
 
 class TestProfileNote:
     """profileNote field parsing."""